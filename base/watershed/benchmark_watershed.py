@@ -0,0 +1,512 @@
+import argparse
+import csv
+import datetime
+import json
+import math
+import os
+import pathlib as pl
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+
+import flopy
+import numpy as np
+from defaults import (
+    Lx,
+    Ly,
+    build_drain_data,
+    build_groundwater_discharge_data,
+    geometry,
+    intersect_segments,
+    layer_broadcast,
+    layer_elevations,
+    set_binary_external,
+    set_structured_idomain,
+    string2geom,
+)
+from flopy.discretization import StructuredGrid
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+FIELDS = (
+    "timestamp",
+    "python",
+    "numpy",
+    "flopy",
+    "mf6",
+    "dx",
+    "dy",
+    "nlay",
+    "nrow",
+    "ncol",
+    "ncells",
+    "binary",
+    "stage",
+    "wall_time",
+    "peak_memory_mb",
+)
+
+
+def _high_water_mark(pid):
+    # peak resident memory of a running process in MB from /proc (linux)
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    return None
+
+
+def _reset_high_water_mark():
+    # reset the peak resident memory of this process to its current
+    # resident memory (linux)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def _process_peak_memory(reset):
+    # peak resident memory of this process in MB, since the last reset on
+    # linux and since the process started elsewhere
+    if reset:
+        peak = _high_water_mark("self")
+        if peak is not None:
+            return peak
+    try:
+        import resource
+    except ImportError:
+        # not available on windows
+        return math.nan
+    # ru_maxrss is in kilobytes on linux and bytes on macOS
+    scale = 2**20 if sys.platform == "darwin" else 2**10
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+class StageTimer:
+    """
+    Record the wall time and peak memory of benchmark stages. By default
+    the peak resident memory of the process is recorded, which is reset
+    at the start of each stage on linux (elsewhere it is the peak since
+    the process started). With trace_memory=True the peak python memory
+    traced by tracemalloc is recorded instead, which includes numpy
+    arrays. Tracing slows down allocation-heavy stages, so the wall times
+    of runs with trace_memory=True are not comparable to the wall times
+    of runs without memory tracing.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.results = []
+
+    def __call__(self, stage, func, *args, **kwargs):
+        if self.trace_memory:
+            tracemalloc.start()
+        else:
+            reset = _reset_high_water_mark()
+        t0 = time.perf_counter()
+        value = func(*args, **kwargs)
+        wall_time = time.perf_counter() - t0
+        if self.trace_memory:
+            peak_memory_mb = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        else:
+            peak_memory_mb = _process_peak_memory(reset)
+        self.add(stage, wall_time, peak_memory_mb)
+        return value
+
+    def add(self, stage, wall_time, peak_memory_mb):
+        self.results.append(
+            {
+                "stage": stage,
+                "wall_time": wall_time,
+                "peak_memory_mb": peak_memory_mb,
+            }
+        )
+        print(f"  {stage:<22s} {wall_time:10.3f} s {peak_memory_mb:10.1f} MB")
+
+
+def get_mf6_version(exe_name):
+    exe_path = shutil.which(exe_name)
+    if exe_path is None:
+        return None
+    proc = subprocess.run(
+        (exe_path, "--version"), capture_output=True, text=True
+    )
+    for line in proc.stdout.splitlines():
+        if line.strip():
+            return line.split(":", 1)[-1].strip()
+    return "unknown"
+
+
+def run_mf6(sim, timer):
+    exe_path = shutil.which(sim.exe_name)
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [exe_path],
+        cwd=sim.sim_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    peak_memory_mb = math.nan
+    if sys.platform.startswith("linux"):
+        # the rusage of a child on linux includes the memory of the
+        # forked python process before exec, so sample the high water
+        # mark of the mf6 process while it runs
+        output = []
+        reader = threading.Thread(
+            target=lambda: output.append(proc.stdout.read())
+        )
+        reader.start()
+        while proc.poll() is None:
+            peak = _high_water_mark(proc.pid)
+            if peak is not None:
+                peak_memory_mb = peak
+            time.sleep(0.05)
+        reader.join()
+        proc.stdout.close()
+        stdout = output[0]
+    elif hasattr(os, "wait4"):
+        # peak resident memory of this mf6 process (ru_maxrss is in
+        # bytes on macOS)
+        with proc.stdout:
+            stdout = proc.stdout.read()
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        peak_memory_mb = rusage.ru_maxrss / 2**20
+    else:
+        # not available on windows
+        stdout, _ = proc.communicate()
+    wall_time = time.perf_counter() - t0
+    success = proc.returncode == 0 and "Normal termination" in stdout
+    timer.add("run", wall_time, peak_memory_mb)
+    if not success:
+        print("  mf6 run did not complete successfully")
+    return success
+
+
+def build_simulation(
+    dx, dy, nlay, raster, sim_ws, exe_name, idomain_method, binary, timer
+):
+    nrow = int(Ly / dy) + 1
+    ncol = int(Lx / dx) + 1
+    boundary_polygon = string2geom(geometry["boundary"])
+    stream_segs = (
+        geometry["streamseg1"],
+        geometry["streamseg2"],
+        geometry["streamseg3"],
+        geometry["streamseg4"],
+    )
+    sgs = [string2geom(sg) for sg in stream_segs]
+
+    working_grid = StructuredGrid(
+        nlay=1,
+        delr=np.full(ncol, dx),
+        delc=np.full(nrow, dy),
+        xoff=0.0,
+        yoff=0.0,
+        top=np.full((nrow, ncol), 1000.0),
+        botm=np.full((1, nrow, ncol), -100.0),
+    )
+    timer(
+        "idomain",
+        set_structured_idomain,
+        working_grid,
+        boundary_polygon,
+        method=idomain_method,
+    )
+    top_wg = timer(
+        "resample",
+        raster.resample_to_grid,
+        working_grid,
+        band=raster.bands[0],
+        method="linear",
+        extrapolate_edges=True,
+    )
+    ixs, cellids, lengths = timer(
+        "intersect", intersect_segments, working_grid, sgs
+    )
+
+    dv0 = 5.0
+    leakance = 1.0 / (0.5 * dv0)
+
+    def _drain_data():
+        drn_data = build_drain_data(
+            working_grid, cellids, lengths, leakance, top_wg, as_recarray=True
+        )
+        gw_discharge_data = build_groundwater_discharge_data(
+            working_grid, leakance, top_wg, as_recarray=True
+        )
+        return drn_data, gw_discharge_data
+
+    drn_data, gw_discharge_data = timer("drain_data", _drain_data)
+
+    topc, botm = layer_elevations(top_wg, nlay, dv0)
+    sim = flopy.mf6.MFSimulation(
+        sim_ws=sim_ws,
+        exe_name=exe_name,
+        memory_print_option="summary",
+    )
+    flopy.mf6.ModflowTdis(sim)
+    flopy.mf6.ModflowIms(
+        sim,
+        complexity="simple",
+        print_option="SUMMARY",
+        csv_outer_output_filerecord="outer.csv",
+        csv_inner_output_filerecord="inner.csv",
+        linear_acceleration="bicgstab",
+        outer_maximum=1000,
+        inner_maximum=100,
+        outer_dvclose=1e-4,
+        inner_dvclose=1e-5,
+        preconditioner_levels=2,
+        relaxation_factor=0.0,
+    )
+    gwf = flopy.mf6.ModflowGwf(
+        sim,
+        save_flows=True,
+        newtonoptions="NEWTON UNDER_RELAXATION",
+    )
+    flopy.mf6.ModflowGwfdis(
+        gwf,
+        nlay=nlay,
+        nrow=nrow,
+        ncol=ncol,
+        delr=dx,
+        delc=dy,
+        idomain=layer_broadcast(working_grid.idomain[0], nlay),
+        top=top_wg,
+        botm=botm,
+    )
+    flopy.mf6.ModflowGwfic(gwf, strt=layer_broadcast(top_wg, nlay))
+    flopy.mf6.ModflowGwfnpf(gwf, icelltype=1, k=1.0)
+    flopy.mf6.ModflowGwfrcha(gwf, recharge=0.000001)
+    flopy.mf6.ModflowGwfdrn(
+        gwf,
+        maxbound=len(drn_data),
+        stress_period_data=drn_data,
+        pname="river",
+        filename="drn_riv.drn",
+    )
+    flopy.mf6.ModflowGwfdrn(
+        gwf,
+        auxiliary=["depth"],
+        auxdepthname="depth",
+        maxbound=len(gw_discharge_data),
+        stress_period_data=gw_discharge_data,
+        pname="gwd",
+        filename="drn_gwd.drn",
+    )
+    flopy.mf6.ModflowGwfoc(
+        gwf,
+        head_filerecord=f"{gwf.name}.hds",
+        budget_filerecord=f"{gwf.name}.cbc",
+        saverecord=[("HEAD", "ALL"), ("BUDGET", "ALL")],
+    )
+    if binary:
+        set_binary_external(sim)
+    timer("write_simulation", sim.write_simulation, silent=True)
+    return sim
+
+
+def benchmark(
+    dx,
+    dy,
+    nlay,
+    raster,
+    sim_ws,
+    exe_name,
+    run,
+    idomain_method,
+    binary,
+    trace_memory=False,
+):
+    nrow = int(Ly / dy) + 1
+    ncol = int(Lx / dx) + 1
+    print(f"dx={dx} dy={dy} nlay={nlay} nrow={nrow} ncol={ncol}")
+
+    timer = StageTimer(trace_memory)
+    sim = build_simulation(
+        dx,
+        dy,
+        nlay,
+        raster,
+        sim_ws,
+        exe_name,
+        idomain_method,
+        binary,
+        timer,
+    )
+    timer(
+        "load_simulation",
+        flopy.mf6.MFSimulation.load,
+        sim_ws=sim_ws,
+        verbosity_level=0,
+    )
+
+    if run:
+        run_mf6(sim, timer)
+
+    size = {
+        "dx": dx,
+        "dy": dy,
+        "nlay": nlay,
+        "nrow": nrow,
+        "ncol": ncol,
+        "ncells": nlay * nrow * ncol,
+        "binary": binary,
+    }
+    return [{**size, **result} for result in timer.results]
+
+
+def write_history(path, rows):
+    path = pl.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".json":
+        history = []
+        if path.is_file():
+            with open(path) as f:
+                history = json.load(f)
+        history += rows
+        with open(path, "w") as f:
+            json.dump(history, f, indent=1)
+    else:
+        write_header = not path.is_file()
+        if not write_header:
+            with open(path, newline="") as f:
+                reader = csv.DictReader(f)
+                if tuple(reader.fieldnames or ()) != FIELDS:
+                    # rewrite older histories with the current columns,
+                    # leaving fields they did not record blank
+                    rows = list(reader) + rows
+                    write_header = True
+        with open(path, "w" if write_header else "a", newline="") as f:
+            writer = csv.DictWriter(
+                f, fieldnames=FIELDS, restval="", extrasaction="ignore"
+            )
+            if write_header:
+                writer.writeheader()
+            writer.writerows(rows)
+    print(f"Benchmark results appended to '{path}'")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the base watershed build, write, and run "
+        + "pipeline over a range of grid sizes."
+    )
+    parser.add_argument(
+        "--dx",
+        nargs="+",
+        type=float,
+        default=[5000.0, 2500.0, 1250.0],
+        help="Cell sizes to benchmark (dy=dx unless --dy is specified)",
+    )
+    parser.add_argument(
+        "--dy",
+        nargs="+",
+        type=float,
+        default=None,
+        help="Row spacing for each --dx value",
+    )
+    parser.add_argument(
+        "--nlay",
+        nargs="+",
+        type=int,
+        default=[5],
+        help="Number of layers to benchmark",
+    )
+    parser.add_argument(
+        "--idomain-method",
+        choices=("intersect", "centers", "fraction"),
+        default="intersect",
+        help="set_structured_idomain method",
+    )
+    parser.add_argument(
+        "--binary",
+        action="store_true",
+        help="Write arrays and lists to binary external files",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record the peak python memory traced by tracemalloc for the "
+        + "build stages instead of the peak resident memory of the process "
+        + "(slows down the stages, so wall times are not comparable to "
+        + "runs without tracing)",
+    )
+    parser.add_argument(
+        "--exe",
+        default="mf6",
+        help="MODFLOW 6 executable",
+    )
+    parser.add_argument(
+        "--no-run",
+        action="store_true",
+        help="Do not run the simulations",
+    )
+    parser.add_argument(
+        "--ws",
+        default="temp/benchmark",
+        help="Workspace for the benchmark simulations",
+    )
+    parser.add_argument(
+        "--output",
+        default="temp/benchmark/watershed_benchmark.csv",
+        help="History file (.csv or .json) the results are appended to",
+    )
+    args = parser.parse_args()
+
+    dys = args.dx if args.dy is None else args.dy
+    if len(dys) != len(args.dx):
+        parser.error("--dy must have the same number of values as --dx")
+
+    root = pl.Path(__file__).resolve().parent
+    raster = flopy.utils.Raster.load(
+        root / "../../data/watershed/fine_topo.tif"
+    )
+
+    mf6_version = get_mf6_version(args.exe)
+    run = not args.no_run
+    if run and mf6_version is None:
+        print(f"'{args.exe}' not found, simulations will not be run")
+        run = False
+
+    environment = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "flopy": flopy.__version__,
+        "mf6": mf6_version,
+    }
+    rows = []
+    for dx, dy in zip(args.dx, dys):
+        for nlay in args.nlay:
+            name = f"dx{dx:g}_dy{dy:g}_nlay{nlay}"
+            if args.binary:
+                name += "_binary"
+            sim_ws = pl.Path(args.ws) / name
+            results = benchmark(
+                dx,
+                dy,
+                nlay,
+                raster,
+                sim_ws,
+                args.exe,
+                run,
+                args.idomain_method,
+                args.binary,
+                args.trace_memory,
+            )
+            rows += [{**environment, **result} for result in results]
+    write_history(args.output, rows)
@@ -0,0 +1,86 @@
+import argparse
+import pathlib as pl
+import sys
+import warnings
+
+import flopy
+from parallel_output import compare_outputs, tolerance_report
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+
+def load_output_control(sim_ws):
+    # only the output control files are needed to find the output files
+    return flopy.mf6.MFSimulation.load(
+        sim_ws=sim_ws, verbosity_level=0, load_only=["oc"]
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the head and budget output of every time step "
+        + "of a serial simulation and the split parallel simulation. The "
+        + "exit status is 1 if a difference exceeds the tolerances."
+    )
+    parser.add_argument("serial_ws", help="Serial simulation workspace")
+    parser.add_argument("parallel_ws", help="Parallel simulation workspace")
+    parser.add_argument(
+        "--node-mapping",
+        default=None,
+        help="Node mapping npz or json file "
+        + "(default is parallel_ws/mfsplit_node_mapping.npz)",
+    )
+    parser.add_argument(
+        "--head-atol",
+        type=float,
+        default=1e-3,
+        help="Head tolerance",
+    )
+    parser.add_argument(
+        "--budget-atol",
+        type=float,
+        default=1e-6,
+        help="Absolute cell flow tolerance",
+    )
+    parser.add_argument(
+        "--budget-rtol",
+        type=float,
+        default=1e-3,
+        help="Cell flow tolerance relative to the largest serial cell flow",
+    )
+    parser.add_argument(
+        "--texts",
+        nargs="*",
+        default=None,
+        help="Budget terms to compare, FLOW-JA-FACE cannot be compared "
+        + "(default is every term except FLOW-JA-FACE)",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="csv file for the differences of every time, layer, and model",
+    )
+    args = parser.parse_args()
+
+    node_mapping = args.node_mapping
+    if node_mapping is None:
+        node_mapping = pl.Path(args.parallel_ws) / "mfsplit_node_mapping.npz"
+    df = compare_outputs(
+        load_output_control(args.serial_ws),
+        load_output_control(args.parallel_ws),
+        node_mapping,
+        texts=args.texts,
+    )
+    if args.output is not None:
+        pl.Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(args.output, index=False)
+        print(f"Differences written to '{args.output}'")
+    report, passed = tolerance_report(
+        df,
+        head_atol=args.head_atol,
+        budget_atol=args.budget_atol,
+        budget_rtol=args.budget_rtol,
+    )
+    print(report.to_string(index=False))
+    print("PASSED" if passed else "FAILED")
+    sys.exit(0 if passed else 1)
@@ -1,8 +1,17 @@
+import hashlib
+import itertools
+import os
 import pathlib as pl
-from typing import List, Tuple, Union
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence, Tuple, Union
 
 import flopy
 import numpy as np
+import shapely
 from flopy.utils.gridintersect import GridIntersect
 from shapely.geometry import LineString, Polygon
 
@@ -180,6 +189,19 @@ def get_parallel_dir():
     return dir
 
 
+def get_cache_dir():
+    """
+    Returns the directory for cached intermediate data
+
+    Returns
+    -------
+    dir: str
+        the cache directory
+    """
+    dir = pl.Path.cwd().joinpath("temp/cache")
+    return dir
+
+
 def string2geom(
     geostring: str,
     conversion: float = None,
@@ -212,10 +234,88 @@ def string2geom(
     return res
 
 
+def _structured_cell_edges(
+    modelgrid: flopy.discretization.StructuredGrid,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get local x and y cell edges for a structured grid. y edges are
+    ordered from the top of the grid (row 0) to the bottom.
+    """
+    xedge = np.zeros(modelgrid.ncol + 1, dtype=float)
+    xedge[1:] = np.cumsum(modelgrid.delr)
+    yedge = np.zeros(modelgrid.nrow + 1, dtype=float)
+    yedge[1:] = np.cumsum(modelgrid.delc)
+    return xedge, yedge[-1] - yedge
+
+
+def _structured_tile_xy(
+    modelgrid: flopy.discretization.StructuredGrid,
+    xlocal: np.ndarray,
+    ylocal: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert local x and y coordinates for a tile of rows to model
+    coordinates with shape (len(ylocal), len(xlocal)).
+    """
+    x, y = np.meshgrid(xlocal, ylocal)
+    return flopy.utils.geometry.transform(
+        x,
+        y,
+        modelgrid.xoffset,
+        modelgrid.yoffset,
+        modelgrid.angrot_radians,
+    )
+
+
+def _structured_tile_mask(
+    modelgrid: flopy.discretization.StructuredGrid,
+    boundary: List[tuple],
+    xedge: np.ndarray,
+    yedge: np.ndarray,
+    method: str,
+) -> np.ndarray:
+    """
+    Calculate the idomain or coverage fraction for a tile of rows using
+    local x and y cell edges for the tile. The prepared polygon is not
+    shared between tiles because prepared geometry predicates are not
+    thread-safe.
+    """
+    polygon = Polygon(boundary)
+    shapely.prepare(polygon)
+    if method == "centers":
+        x, y = _structured_tile_xy(
+            modelgrid,
+            0.5 * (xedge[:-1] + xedge[1:]),
+            0.5 * (yedge[:-1] + yedge[1:]),
+        )
+        return shapely.contains_xy(polygon, x, y).astype(int)
+
+    # cell corners in counter-clockwise order
+    x, y = _structured_tile_xy(modelgrid, xedge, yedge)
+    xy = np.stack((x, y), axis=-1)
+    corners = np.stack(
+        (xy[1:, :-1], xy[1:, 1:], xy[:-1, 1:], xy[:-1, :-1]), axis=2
+    )
+    shape = corners.shape[:2]
+    cells = shapely.polygons(corners.reshape(-1, 4, 2))
+    fraction = np.zeros(cells.shape, dtype=float)
+    inside = shapely.contains_properly(polygon, cells)
+    fraction[inside] = 1.0
+    edge = ~inside & shapely.intersects(polygon, cells)
+    if edge.any():
+        fraction[edge] = shapely.area(
+            shapely.intersection(cells[edge], polygon)
+        ) / shapely.area(cells[edge])
+    return fraction.reshape(shape)
+
+
 def set_structured_idomain(
     modelgrid: flopy.discretization.StructuredGrid,
     boundary: List[tuple],
-) -> None:
+    method: str = "intersect",
+    tile_rows: int = None,
+    max_workers: int = None,
+) -> Union[None, np.ndarray]:
     """
     Set the idomain for a structured grid using a boundary line.
 
@@ -225,10 +325,26 @@ def set_structured_idomain(
         flopy modelgrid object
     boundary: List(tuple)
         list of x,y tuples defining the boundary of the active model domain.
+    method: str, optional
+        "intersect" makes cells that intersect the boundary polygon
+        active using GridIntersect. "centers" makes cells with a cell
+        center inside the boundary polygon active. "fraction" calculates
+        the fraction of each cell covered by the boundary polygon and
+        makes cells with a fraction greater than zero active. The
+        "centers" and "fraction" methods process the grid in tiles of
+        rows on a thread pool. (Default is "intersect")
+    tile_rows: int, optional
+        number of rows in each tile (Default is None, which uses tiles
+        with approximately 2**20 cells)
+    max_workers: int, optional
+        maximum number of threads (Default is None, which uses the
+        ThreadPoolExecutor default)
 
     Returns
     -------
-    None
+    fraction: numpy.ndarray
+        fraction of each cell covered by the boundary polygon if method
+        is "fraction", otherwise None
 
     """
     if modelgrid.grid_type != "structured":
@@ -236,22 +352,103 @@ def set_structured_idomain(
             f"modelgrid must be 'structured' not '{modelgrid.grid_type}'"
         )
 
-    ix = GridIntersect(modelgrid, method="vertex", rtree=True)
-    result = ix.intersect(Polygon(boundary))
-    idx = [coords for coords in result.cellids]
-    idx = np.array(idx, dtype=int)
-    nr = idx.shape[0]
-    if idx.ndim == 1:
-        idx = idx.reshape((nr, 1))
-
-    idx = tuple([idx[:, i] for i in range(idx.shape[1])])
-    idomain = np.zeros(modelgrid.shape[1:], dtype=int)
-    idomain[idx] = 1
+    if method == "intersect":
+        ix = GridIntersect(modelgrid, method="vertex", rtree=True)
+        result = ix.intersect(Polygon(boundary))
+        idx = [coords for coords in result.cellids]
+        idx = np.array(idx, dtype=int)
+        nr = idx.shape[0]
+        if idx.ndim == 1:
+            idx = idx.reshape((nr, 1))
+
+        idx = tuple([idx[:, i] for i in range(idx.shape[1])])
+        idomain = np.zeros(modelgrid.shape[1:], dtype=int)
+        idomain[idx] = 1
+        fraction = None
+    elif method in ("centers", "fraction"):
+        nrow, ncol = modelgrid.nrow, modelgrid.ncol
+        if tile_rows is None:
+            tile_rows = max(1, 2**20 // ncol)
+
+        xedge, yedge = _structured_cell_edges(modelgrid)
+
+        if method == "centers":
+            values = np.zeros((nrow, ncol), dtype=int)
+        else:
+            values = np.zeros((nrow, ncol), dtype=float)
+
+        def _process_tile(i0):
+            i1 = min(i0 + tile_rows, nrow)
+            values[i0:i1] = _structured_tile_mask(
+                modelgrid, boundary, xedge, yedge[i0 : i1 + 1], method
+            )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_process_tile, range(0, nrow, tile_rows)))
+
+        if method == "centers":
+            idomain = values
+            fraction = None
+        else:
+            idomain = (values > 0.0).astype(int)
+            fraction = values
+    else:
+        raise ValueError(
+            "method must be 'intersect', 'centers', or 'fraction' "
+            + f"not '{method}'"
+        )
     idomain = idomain.reshape(modelgrid.shape)
 
     # set modelgrid idomain
     modelgrid.idomain = idomain
-    return
+    return fraction
+
+
+def intersect_cache_key(
+    modelgrid: Union[
+        flopy.discretization.StructuredGrid, flopy.discretization.VertexGrid
+    ],
+    segments: List[List[tuple]],
+) -> str:
+    """
+    Calculate the intersect_segments cache key for a modelgrid and a
+    set of segments
+
+    Parameters
+    ----------
+    modelgrid: flopy.discretization.StructuredGrid
+        flopy modelgrid object
+    segments: list of list of tuples
+        List of segment x,y tuples
+
+    Returns
+    -------
+    key: str
+        hexadecimal sha1 digest of the grid geometry and segment vertices
+
+    """
+    sha = hashlib.sha1(grid_fingerprint(modelgrid).encode())
+    for sg in segments:
+        arr = np.ascontiguousarray(sg, dtype=float)
+        sha.update(str(arr.shape).encode())
+        sha.update(arr.tobytes())
+    return sha.hexdigest()
+
+
+def _intersect_cache_path(cache_dir: Union[str, os.PathLike], key: str):
+    return pl.Path(cache_dir) / f"intersect_{key}.npz"
+
+
+def _temp_path(path: pl.Path) -> pl.Path:
+    """
+    Create a uniquely named temporary file next to path. The file is
+    written and then renamed to path so readers never see partial files.
+    """
+    fd, temp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f"{path.name}.", suffix=".tmp"
+    )
+    os.close(fd)
+    return pl.Path(temp_path)
 
 
 def intersect_segments(
@@ -259,8 +456,10 @@ def intersect_segments(
         flopy.discretization.StructuredGrid, flopy.discretization.VertexGrid
     ],
     segments: List[List[tuple]],
+    cache_dir: Union[str, os.PathLike] = None,
 ) -> Tuple[flopy.utils.GridIntersect, list, list]:
     """
+    Intersect segments with a modelgrid
 
     Parameters
     ----------
@@ -268,37 +467,358 @@ def intersect_segments(
         flopy modelgrid object
     segments: list of list of tuples
         List of segment x,y tuples
+    cache_dir: str or PathLike, optional
+        directory used to cache intersection results. Results are keyed
+        by intersect_cache_key() and are reused if the grid geometry and
+        segment vertices are unchanged. (Default is None, which does
+        not cache results)
 
     Returns
     -------
     ixs: flopy.utils.GridIntersect
-        flopy GridIntersect object
+        flopy GridIntersect object. None if results were loaded from
+        the cache
     cellids: list
         list of intersected cellids
     lengths: list
         list of intersected lengths
 
     """
+    cache_path = None
+    if cache_dir is not None:
+        key = intersect_cache_key(modelgrid, segments)
+        cache_path = _intersect_cache_path(cache_dir, key)
+        if cache_path.is_file():
+            with np.load(cache_path) as data:
+                cellids = data["cellids"]
+                lengths = data["lengths"]
+            if modelgrid.grid_type == "structured":
+                cellids = list(map(tuple, cellids.tolist()))
+            else:
+                cellids = cellids.ravel().tolist()
+            return None, cellids, lengths.tolist()
+
     ixs = flopy.utils.GridIntersect(
         modelgrid,
         method=modelgrid.grid_type,
     )
     cellids = []
     lengths = []
-    for sg in segments:
+    segment_ids = []
+    for idx, sg in enumerate(segments):
         v = ixs.intersect(LineString(sg), sort_by_cellid=True)
         cellids += v["cellids"].tolist()
         lengths += v["lengths"].tolist()
+        segment_ids += [idx] * v.shape[0]
+
+    if cache_path is not None:
+        ncelldim = 2 if modelgrid.grid_type == "structured" else 1
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = _temp_path(cache_path)
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                cellids=np.array(cellids, dtype=np.int32).reshape(
+                    -1, ncelldim
+                ),
+                lengths=np.array(lengths, dtype=float),
+                segment_ids=np.array(segment_ids, dtype=np.int32),
+                nsegments=len(segments),
+                grid_type=modelgrid.grid_type,
+            )
+        os.replace(temp_path, cache_path)
     return ixs, cellids, lengths
 
 
-def cell_areas(
+def _intersect_segment_chunk(
+    ixs: flopy.utils.GridIntersect,
+    lines: List[LineString],
+    segment_ids: Sequence[int],
+) -> List[tuple]:
+    results = []
+    for line, segment_id in zip(lines, segment_ids):
+        v = ixs.intersect(line, sort_by_cellid=False)
+        n = v.shape[0]
+        if n == 0:
+            continue
+        cellids = np.array(v["cellids"].tolist(), dtype=int).reshape(n, -1)
+        midpoints = shapely.line_interpolate_point(
+            v["ixshapes"], 0.5, normalized=True
+        )
+        distance = shapely.line_locate_point(line, midpoints)
+        order = np.argsort(distance, kind="stable")
+        results.append(
+            (
+                np.full(n, segment_id, dtype=int),
+                cellids[order],
+                np.asarray(v["lengths"], dtype=float)[order],
+                distance[order],
+            )
+        )
+    return results
+
+
+def intersect_segments_bulk(
     modelgrid: Union[
         flopy.discretization.StructuredGrid, flopy.discretization.VertexGrid
     ],
+    segments: Sequence[Union[List[tuple], LineString]],
+    segment_ids: Sequence[int] = None,
+    chunksize: int = 64,
+    max_workers: int = None,
+) -> np.recarray:
+    """
+    Intersect many segments with a modelgrid using a single GridIntersect
+    object. Segments are intersected in chunks on a thread pool and each
+    intersected cell is tagged with the segment it belongs to.
+
+    Parameters
+    ----------
+    modelgrid: flopy.discretization.StructuredGrid
+        flopy modelgrid object
+    segments: list of list of tuples or shapely LineStrings
+        segment x,y tuples (for example, from string2geom) or
+        LineStrings (for example, NHD flowlines)
+    segment_ids: sequence of ints, optional
+        identifier for each segment (Default is None, which uses the
+        position of each segment in segments)
+    chunksize: int, optional
+        number of segments intersected by each task (Default is 64)
+    max_workers: int, optional
+        maximum number of threads (Default is None, which uses the
+        ThreadPoolExecutor default)
+
+    Returns
+    -------
+    result: numpy.recarray
+        segment_id, cellid_row and cellid_column (or cellid_cell),
+        length, and distance fields. distance is the distance from the
+        start of the segment to the middle of the intersected part of
+        the segment. Records are ordered by segment and then by
+        distance.
+
+    """
+    lines = [
+        sg if isinstance(sg, LineString) else LineString(sg) for sg in segments
+    ]
+    if segment_ids is None:
+        segment_ids = range(len(lines))
+    elif len(segment_ids) != len(lines):
+        raise ValueError(
+            f"number of segment_ids ({len(segment_ids)}) does not match "
+            + f"the number of segments ({len(lines)})"
+        )
+    segment_ids = list(segment_ids)
+
+    ixs = flopy.utils.GridIntersect(
+        modelgrid,
+        method=modelgrid.grid_type,
+    )
+    chunks = [
+        (lines[i : i + chunksize], segment_ids[i : i + chunksize])
+        for i in range(0, len(lines), chunksize)
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_intersect_segment_chunk, ixs, *chunk)
+            for chunk in chunks
+        ]
+        results = [r for future in futures for r in future.result()]
+
+    cellid_dtype = _cellid_dtype(modelgrid)[1:]
+    dtype = (
+        [("segment_id", int)]
+        + cellid_dtype
+        + [("length", float), ("distance", float)]
+    )
+    result = np.recarray(sum(r[0].shape[0] for r in results), dtype=dtype)
+    if results:
+        ids, cellids, lengths, distance = (
+            np.concatenate(values) for values in zip(*results)
+        )
+        result["segment_id"] = ids
+        for idx, (name, _) in enumerate(cellid_dtype):
+            result[name] = cellids[:, idx]
+        result["length"] = lengths
+        result["distance"] = distance
+    return result
+
+
+def intersect_cache_info(
+    cache_dir: Union[str, os.PathLike],
+) -> List[dict]:
+    """
+    Summarize the cached intersect_segments results in a directory
+
+    Parameters
+    ----------
+    cache_dir: str or PathLike
+        intersect_segments cache directory
+
+    Returns
+    -------
+    info: list of dicts
+        key, path, grid_type, nsegments, ncells, size (bytes), and
+        modified (time stamp) for each cached result
+
+    """
+    info = []
+    for path in sorted(pl.Path(cache_dir).glob("intersect_*.npz")):
+        with np.load(path) as data:
+            grid_type = str(data["grid_type"])
+            nsegments = int(data["nsegments"])
+            ncells = int(data["lengths"].shape[0])
+        stat = path.stat()
+        info.append(
+            {
+                "key": path.stem[len("intersect_") :],
+                "path": path,
+                "grid_type": grid_type,
+                "nsegments": nsegments,
+                "ncells": ncells,
+                "size": stat.st_size,
+                "modified": time.ctime(stat.st_mtime),
+            }
+        )
+    return info
+
+
+def clear_intersect_cache(
+    cache_dir: Union[str, os.PathLike],
+    key: str = None,
+) -> int:
+    """
+    Remove cached intersect_segments results
+
+    Parameters
+    ----------
+    cache_dir: str or PathLike
+        intersect_segments cache directory
+    key: str, optional
+        remove the result for a single intersect_cache_key() value
+        (Default is None, which removes all cached results)
+
+    Returns
+    -------
+    nremoved: int
+        number of cached results removed
+
+    """
+    if key is None:
+        paths = list(pl.Path(cache_dir).glob("intersect_*.npz"))
+    else:
+        paths = [_intersect_cache_path(cache_dir, key)]
+    nremoved = 0
+    for path in paths:
+        if path.is_file():
+            path.unlink()
+            nremoved += 1
+    return nremoved
+
+
+def _cell_vertex_index(
+    modelgrid: Union[
+        flopy.discretization.VertexGrid,
+        flopy.discretization.UnstructuredGrid,
+    ],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the vertices of a vertex or unstructured grid and a rectangular
+    vertex index array for every cell. Cells with fewer vertices than the
+    cell with the most vertices are padded with their last vertex.
+
+    Parameters
+    ----------
+    modelgrid: flopy.discretization.VertexGrid
+        flopy modelgrid object
+
+    Returns
+    -------
+    verts: numpy.ndarray
+        x,y vertices with shape (nvert, 2)
+    index: numpy.ndarray
+        padded vertex index for each cell with shape (ncells, max_nverts)
+
+    """
+    iverts = modelgrid.iverts
+    if iverts is None or modelgrid.verts is None:
+        raise ValueError(
+            f"'{modelgrid.grid_type}' modelgrid does not define vertices"
+        )
+    verts = np.asarray(modelgrid.verts, dtype=float)[:, :2]
+    nverts = np.fromiter(map(len, iverts), dtype=int, count=len(iverts))
+    flat = np.fromiter(
+        itertools.chain.from_iterable(iverts),
+        dtype=int,
+        count=nverts.sum(),
+    )
+    start = np.zeros(nverts.shape, dtype=int)
+    start[1:] = np.cumsum(nverts)[:-1]
+    position = np.minimum(
+        np.arange(nverts.max())[np.newaxis, :], nverts[:, np.newaxis] - 1
+    )
+    index = flat[start[:, np.newaxis] + position]
+    return verts, index
+
+
+def grid_fingerprint(
+    modelgrid: Union[
+        flopy.discretization.StructuredGrid,
+        flopy.discretization.VertexGrid,
+        flopy.discretization.UnstructuredGrid,
+    ],
+) -> str:
+    """
+    Calculate a hash of the horizontal geometry of a modelgrid. Grids
+    with the same fingerprint have identical cell geometry.
+
+    Parameters
+    ----------
+    modelgrid: flopy.discretization.StructuredGrid
+        flopy modelgrid object
+
+    Returns
+    -------
+    fingerprint: str
+        hexadecimal sha1 digest of the grid geometry
+
+    """
+    sha = hashlib.sha1(modelgrid.grid_type.encode())
+    offsets = (modelgrid.xoffset, modelgrid.yoffset, modelgrid.angrot)
+    sha.update(np.array(offsets, dtype=float).tobytes())
+    if modelgrid.grid_type == "structured":
+        arrays = (modelgrid.delr, modelgrid.delc)
+    elif modelgrid.grid_type in ("vertex", "unstructured"):
+        arrays = _cell_vertex_index(modelgrid)
+    else:
+        raise ValueError(
+            f"modelgrid grid type '{modelgrid.grid_type}' not supported"
+        )
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        sha.update(str(arr.shape).encode())
+        sha.update(arr.tobytes())
+    return sha.hexdigest()
+
+
+# cell areas keyed by grid_fingerprint(), the least recently used areas
+# are dropped once there are more than _cell_area_cache_size grids
+_cell_area_cache = OrderedDict()
+_cell_area_cache_size = 8
+
+
+def cell_areas(
+    modelgrid: Union[
+        flopy.discretization.StructuredGrid,
+        flopy.discretization.VertexGrid,
+        flopy.discretization.UnstructuredGrid,
+    ],
 ) -> np.ndarray:
     """
-    Calculate cell areas
+    Calculate cell areas. Structured grid areas are calculated from
+    delr and delc. Vertex and unstructured grid areas are calculated
+    from the cell vertices using the shoelace formula. Results are
+    cached by grid geometry so the returned array is read-only.
 
     Parameters
     ----------
@@ -308,41 +828,97 @@ def cell_areas(
     Returns
     -------
     areas: numpy.ndarray
-        cell areas
+        cell areas with shape (nrow, ncol) for structured grids,
+        (ncpl,) for vertex grids, and (nnodes,) for unstructured grids
 
     """
+    if modelgrid.grid_type not in ("structured", "vertex", "unstructured"):
+        raise ValueError(
+            "modelgrid must be 'structured', 'vertex', or 'unstructured' "
+            + f"not {modelgrid.grid_type}"
+        )
+
+    key = grid_fingerprint(modelgrid)
+    areas = _cell_area_cache.get(key)
+    if areas is not None:
+        _cell_area_cache.move_to_end(key)
+        return areas
+
     if modelgrid.grid_type == "structured":
-        nrow, ncol = modelgrid.nrow, modelgrid.ncol
-        areas = np.zeros((nrow, ncol), dtype=float)
-        for r in range(nrow):
-            for c in range(ncol):
-                cellid = (r, c)
-                vertices = np.array(modelgrid.get_cell_vertices(cellid))
-                area = Polygon(vertices).area
-                areas[cellid] = area
+        delr = np.asarray(modelgrid.delr, dtype=float)
+        delc = np.asarray(modelgrid.delc, dtype=float)
+        areas = np.outer(delc, delr)
+    else:
+        verts, index = _cell_vertex_index(modelgrid)
+        x = verts[index, 0]
+        y = verts[index, 1]
+        # shift to the first vertex of each cell to limit round-off
+        x -= x[:, :1]
+        y -= y[:, :1]
+        xn = np.roll(x, -1, axis=1)
+        yn = np.roll(y, -1, axis=1)
+        areas = 0.5 * np.abs(np.sum(x * yn - xn * y, axis=1))
+    areas.flags.writeable = False
+    _cell_area_cache[key] = areas
+    while len(_cell_area_cache) > _cell_area_cache_size:
+        _cell_area_cache.popitem(last=False)
+    return areas
+
+
+def clear_cell_area_cache() -> None:
+    """
+    Clear cached cell areas
+
+    Returns
+    -------
+    None
+
+    """
+    _cell_area_cache.clear()
+    return
+
+
+def _cellid_dtype(
+    modelgrid: Union[
+        flopy.discretization.StructuredGrid, flopy.discretization.VertexGrid
+    ],
+) -> List[tuple]:
+    """
+    Get the cellid fields used by flopy for list-based package data
+
+    Parameters
+    ----------
+    modelgrid: flopy.discretization.StructuredGrid
+        flopy modelgrid object
+
+    Returns
+    -------
+    dtype: list of tuples
+        cellid field names and types
+
+    """
+    if modelgrid.grid_type == "structured":
+        names = ("cellid_layer", "cellid_row", "cellid_column")
     elif modelgrid.grid_type == "vertex":
-        areas = np.zeros(modelgrid.ncpl, dtype=float)
-        for idx in range(modelgrid.ncpl):
-            vertices = np.array(modelgrid.get_cell_vertices(idx))
-            area = Polygon(vertices).area
-            areas[idx] = area
+        names = ("cellid_layer", "cellid_cell")
     else:
         raise ValueError(
             "modelgrid must be 'structured' or 'vertex' not "
             + f"{modelgrid.grid_type}"
         )
-    return areas
+    return [(name, int) for name in names]
 
 
 def build_drain_data(
     modelgrid: Union[
         flopy.discretization.StructuredGrid, flopy.discretization.VertexGrid
     ],
-    cellids: list,
-    lengths: list,
+    cellids: Union[list, np.ndarray],
+    lengths: Union[list, np.ndarray],
     leakance: float,
     elevation: np.ndarray,
-) -> List[tuple]:
+    as_recarray: bool = False,
+) -> Union[List[tuple], np.recarray]:
     """
     Build drain package data represent river segments
 
@@ -350,30 +926,50 @@ def build_drain_data(
     ----------
     modelgrid: flopy.discretization.StructuredGrid
         flopy modelgrid object
-    cellids: list
-        list of intersected cellids
-    lengths: list
-        list of intersected lengths
+    cellids: list or numpy.ndarray
+        intersected cellids as a list of (row, column) tuples or an
+        array with shape (n, 2) for structured grids and a list or
+        array of cell numbers for vertex grids
+    lengths: list or numpy.ndarray
+        intersected lengths
     leakance: float
         drainage leakance value
     elevation: numpy.ndarray
         land surface elevation
+    as_recarray: bool, optional
+        return a numpy recarray with cellid_layer, cellid_row,
+        cellid_column (or cellid_cell), elev, and cond fields that can
+        be passed directly to flopy.mf6.ModflowGwfdrn (Default is False)
 
     Returns
     -------
-    drn_data: list of tuples
+    drn_data: list of tuples or numpy.recarray
         Drain package data for stream segments
 
     """
-    drn_data = []
-    for cellid, length in zip(cellids, lengths):
-        x = modelgrid.xcellcenters[cellid]
-        width = 5.0 + (14.0 / Lx) * (Lx - x)
-        conductance = leakance * length * width
-        if not isinstance(cellid, tuple):
-            cellid = (cellid,)
-        drn_data.append((0, *cellid, elevation[cellid], conductance))
-    return drn_data
+    dtype = _cellid_dtype(modelgrid) + [("elev", float), ("cond", float)]
+    ncelldim = len(dtype) - 3
+    cellids = np.asarray(cellids, dtype=int).reshape(-1, ncelldim)
+    lengths = np.asarray(lengths, dtype=float).ravel()
+    if cellids.shape[0] != lengths.shape[0]:
+        raise ValueError(
+            f"number of cellids ({cellids.shape[0]}) does not match "
+            + f"the number of lengths ({lengths.shape[0]})"
+        )
+    index = tuple(cellids.T)
+
+    x = np.asarray(modelgrid.xcellcenters)[index]
+    width = 5.0 + (14.0 / Lx) * (Lx - x)
+
+    drn_data = np.recarray(lengths.shape[0], dtype=dtype)
+    drn_data["cellid_layer"] = 0
+    for name, idx in zip(drn_data.dtype.names[1:], index):
+        drn_data[name] = idx
+    drn_data["elev"] = np.asarray(elevation)[index]
+    drn_data["cond"] = leakance * lengths * width
+    if as_recarray:
+        return drn_data
+    return drn_data.tolist()
 
 
 def build_groundwater_discharge_data(
@@ -382,9 +978,11 @@ def build_groundwater_discharge_data(
     ],
     leakance: float,
     elevation: np.ndarray,
-) -> List[tuple]:
+    as_recarray: bool = False,
+) -> Union[List[tuple], np.recarray]:
     """
-    Build drain package data represent river segments
+    Build drain package data to represent groundwater discharge to the
+    land surface in active cells
 
     Parameters
     ----------
@@ -394,30 +992,124 @@ def build_groundwater_discharge_data(
         drainage leakance value
     elevation: numpy.ndarray
         land surface elevation
+    as_recarray: bool, optional
+        return a numpy recarray with cellid_layer, cellid_row,
+        cellid_column (or cellid_cell), elev, cond, and depth fields
+        that can be passed directly to flopy.mf6.ModflowGwfdrn
+        (Default is False)
 
     Returns
     -------
-    drn_data: list of tuples
-        Drain package data for stream segments
+    drn_data: list of tuples or numpy.recarray
+        Drain package data for groundwater discharge
     """
     areas = cell_areas(modelgrid)
-    drn_data = []
-    idomain = modelgrid.idomain[0]
-    for idx in range(modelgrid.ncpl):
-        if modelgrid.grid_type == "structured":
-            r, c = modelgrid.get_lrc(idx)[0][1:]
-            cellid = (r, c)
-        else:
-            cellid = idx
-        area = areas[cellid]
-        if idomain[cellid] == 1:
-            conductance = leakance * area
-            if not isinstance(cellid, tuple):
-                cellid = (cellid,)
-            drn_data.append(
-                (0, *cellid, elevation[cellid] - 0.5, conductance, 1.0)
-            )
-    return drn_data
+    elevation = np.asarray(elevation).reshape(areas.shape)
+    idomain = np.asarray(modelgrid.idomain[0]).reshape(areas.shape)
+    active = np.nonzero(idomain == 1)
+
+    dtype = _cellid_dtype(modelgrid) + [
+        ("elev", float),
+        ("cond", float),
+        ("depth", float),
+    ]
+    drn_data = np.recarray(active[0].shape[0], dtype=dtype)
+    drn_data["cellid_layer"] = 0
+    for name, index in zip(drn_data.dtype.names[1:], active):
+        drn_data[name] = index
+    drn_data["elev"] = elevation[active] - 0.5
+    drn_data["cond"] = leakance * areas[active]
+    drn_data["depth"] = 1.0
+    if as_recarray:
+        return drn_data
+    return drn_data.tolist()
+
+
+def layer_elevations(
+    top: Union[float, np.ndarray],
+    nlay: int,
+    dv0: Union[float, np.ndarray],
+    growth_factor: float = 1.5,
+    min_thickness: float = None,
+    dtype: np.dtype = np.float64,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate layer top and bottom elevations using layer thicknesses
+    that start at dv0 and increase by growth_factor in each layer. The
+    layer tops and bottoms are views of a single (nlay + 1) array of
+    surface elevations.
+
+    Parameters
+    ----------
+    top: float or numpy.ndarray
+        land surface elevation
+    nlay: int
+        number of layers
+    dv0: float or numpy.ndarray
+        thickness of the top layer. An array must be broadcastable to
+        the shape of top.
+    growth_factor: float, optional
+        layer thickness multiplier (Default is 1.5)
+    min_thickness: float, optional
+        minimum layer thickness (Default is None)
+    dtype: numpy.dtype, optional
+        data type of the layer elevations. np.float32 halves the memory
+        required. (Default is np.float64)
+
+    Returns
+    -------
+    topc: numpy.ndarray
+        layer top elevations with shape (nlay,) + top.shape
+    botm: numpy.ndarray
+        layer bottom elevations with shape (nlay,) + top.shape
+
+    """
+    top = np.asarray(top)
+    dv0 = np.asarray(dv0)
+    shape = np.broadcast_shapes(top.shape, dv0.shape)
+    factors = growth_factor ** np.arange(nlay, dtype=float)
+
+    surfaces = np.empty((nlay + 1,) + shape, dtype=dtype)
+    surfaces[0] = top
+    depth = surfaces[1:]
+    if dv0.ndim == 0:
+        thickness = factors * dv0
+        if min_thickness is not None:
+            thickness = np.maximum(thickness, min_thickness)
+        depth[:] = np.cumsum(thickness).reshape((nlay,) + (1,) * len(shape))
+    else:
+        depth[:] = factors.reshape((nlay,) + (1,) * len(shape))
+        depth *= dv0
+        if min_thickness is not None:
+            np.maximum(depth, min_thickness, out=depth)
+        np.cumsum(depth, axis=0, out=depth)
+    np.subtract(surfaces[0], depth, out=depth)
+    return surfaces[:-1], surfaces[1:]
+
+
+def layer_broadcast(
+    arr: np.ndarray,
+    nlay: int,
+) -> np.ndarray:
+    """
+    Repeat a single layer array for every layer without copying data.
+    The returned array is a read-only view.
+
+    Parameters
+    ----------
+    arr: numpy.ndarray
+        single layer array (for example, starting heads or idomain)
+    nlay: int
+        number of layers
+
+    Returns
+    -------
+    arr: numpy.ndarray
+        read-only view with shape (nlay,) + arr.shape
+
+    """
+    arr = np.asarray(arr)
+    return np.broadcast_to(arr, (nlay,) + arr.shape)
 
 
 def get_model_cell_count(
@@ -493,3 +1185,997 @@ def get_simulation_cell_count(
         nactive += j
 
     return ncells, nactive
+
+
+def set_binary_external(
+    simulation: flopy.mf6.MFSimulation,
+    external_folder: str = "external",
+) -> None:
+    """
+    Store the griddata arrays and stress period lists of a simulation
+    in binary external files. Arrays and lists are written with numpy
+    instead of being formatted as text, which reduces the time needed
+    to write the simulation and to load it with MFSimulation.load().
+    Lists with boundnames cannot be binary and are written as external
+    text files.
+
+    Parameters
+    ----------
+    simulation: flopy.mf6.MFSimulation
+        flopy mf6 simulation object
+    external_folder: str, optional
+        folder for the external files relative to the simulation
+        workspace (Default is "external")
+
+    Returns
+    -------
+    None
+    """
+    simulation.set_all_data_external(
+        check_data=False,
+        external_data_folder=external_folder,
+        binary=True,
+    )
+    return
+
+
+def _mf6_records(path: Union[str, os.PathLike]):
+    """
+    Yield lists of tokens for each non-blank line of a MODFLOW 6 input
+    file with comments and quotes removed
+    """
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].split("!", 1)[0].strip()
+            if line:
+                yield line.replace("'", "").replace('"', "").split()
+
+
+def _read_mf6_block(records, block: str) -> List[List[str]]:
+    """
+    Get the records in the next block with the name block
+    """
+    block = block.upper()
+    for tokens in records:
+        if tokens[0].upper() == "BEGIN" and tokens[1].upper() == block:
+            break
+    else:
+        return []
+    values = []
+    for tokens in records:
+        if tokens[0].upper() == "END":
+            break
+        values.append(tokens)
+    return values
+
+
+def _read_idomain_values(
+    records,
+    control: List[str],
+    count: int,
+    ws: pl.Path,
+) -> np.ndarray:
+    """
+    Read count idomain values using a MODFLOW 6 array control record
+    """
+    upper = [token.upper() for token in control]
+    factor = 1
+    if "FACTOR" in upper:
+        factor = int(float(control[upper.index("FACTOR") + 1]))
+    method = upper[0]
+    if method == "CONSTANT":
+        return np.full(count, int(float(control[1])), dtype=np.int32)
+    elif method == "INTERNAL":
+        values = []
+        nvalues = 0
+        while nvalues < count:
+            tokens = next(records)
+            values += tokens
+            nvalues += len(tokens)
+        arr = np.array(values[:count], dtype=float).astype(np.int32)
+    elif method == "OPEN/CLOSE":
+        path = ws / control[1]
+        if "(BINARY)" in upper:
+            header_size = flopy.utils.BinaryHeader.set_dtype(
+                bintype="vardis", precision="double"
+            ).itemsize
+            arr = np.fromfile(
+                path, dtype=np.int32, count=count, offset=header_size
+            )
+        else:
+            arr = np.loadtxt(path, dtype=float, ndmin=1).ravel()[:count]
+            arr = arr.astype(np.int32)
+    else:
+        raise ValueError(f"unsupported array control record: {control}")
+    return arr * factor
+
+
+def read_model_cell_count(
+    dis_path: Union[str, os.PathLike],
+    ws: Union[str, os.PathLike] = None,
+) -> Tuple[int, int]:
+    """
+    Get the total number of cells and number of active cells in a
+    model from the dimensions block and the idomain array of a
+    DIS, DISV, or DISU input file without loading the model.
+
+    Parameters
+    ----------
+    dis_path: str or PathLike
+        DIS, DISV, or DISU input file path
+    ws: str or PathLike, optional
+        directory that OPEN/CLOSE file names are relative to (Default is
+        None, which uses the directory containing dis_path)
+
+    Returns
+    -------
+    ncells: int
+        Total number of cells in a model
+    nactive: int
+        Total number of active cells in a model
+    """
+    dis_path = pl.Path(dis_path)
+    ws = dis_path.parent if ws is None else pl.Path(ws)
+    records = _mf6_records(dis_path)
+    dimensions = {
+        tokens[0].upper(): int(tokens[1])
+        for tokens in _read_mf6_block(records, "dimensions")
+    }
+    nlay = dimensions.get("NLAY", 1)
+    if "NODES" in dimensions:
+        ncells = dimensions["NODES"]
+        ncpl = ncells
+    elif "NCPL" in dimensions:
+        ncpl = dimensions["NCPL"]
+        ncells = nlay * ncpl
+    else:
+        ncpl = dimensions["NROW"] * dimensions["NCOL"]
+        ncells = nlay * ncpl
+
+    nactive = ncells
+    griddata_found = False
+    for tokens in records:
+        name = tokens[0].upper()
+        if name == "BEGIN" and tokens[1].upper() == "GRIDDATA":
+            griddata_found = True
+        elif not griddata_found:
+            continue
+        elif name == "END":
+            break
+        elif name == "IDOMAIN":
+            layered = len(tokens) > 1 and tokens[1].upper() == "LAYERED"
+            if layered:
+                arrays = [
+                    _read_idomain_values(records, next(records), ncpl, ws)
+                    for _ in range(nlay)
+                ]
+                idomain = np.concatenate(arrays)
+            else:
+                idomain = _read_idomain_values(
+                    records, next(records), ncells, ws
+                )
+            nactive = int(np.count_nonzero(idomain == 1))
+            break
+    return ncells, nactive
+
+
+def read_simulation_cell_count(
+    sim_ws: Union[str, os.PathLike],
+    sim_name: str = "mfsim.nam",
+) -> Tuple[int, int]:
+    """
+    Get the total number of cells and number of active cells in a
+    simulation by reading the simulation name file, the model name
+    files, and the discretization file of each model without loading
+    the simulation.
+
+    Parameters
+    ----------
+    sim_ws: str or PathLike
+        simulation workspace
+    sim_name: str, optional
+        simulation name file (Default is "mfsim.nam")
+
+    Returns
+    -------
+    ncells: int
+        Total number of cells in a simulation
+    nactive: int
+        Total number of active cells in a simulation
+    """
+    sim_ws = pl.Path(sim_ws)
+    ncells = 0
+    nactive = 0
+    sim_records = _mf6_records(sim_ws / sim_name)
+    for model in _read_mf6_block(sim_records, "models"):
+        packages = _read_mf6_block(_mf6_records(sim_ws / model[1]), "packages")
+        for package in packages:
+            if package[0].upper() in ("DIS6", "DISV6", "DISU6"):
+                i, j = read_model_cell_count(sim_ws / package[1], ws=sim_ws)
+                ncells += i
+                nactive += j
+                break
+        else:
+            raise ValueError(
+                f"discretization package not found in '{model[1]}'"
+            )
+
+    return ncells, nactive
+
+
+def create_binary_array(
+    path: Union[str, os.PathLike],
+    shape: Tuple[int, ...],
+    text: str,
+    ilay: int = 1,
+    dtype: np.dtype = np.float64,
+) -> np.memmap:
+    """
+    Create a MODFLOW 6 binary input array file for a single layer and
+    return a writable memory map of the array data. Array data are
+    written to disk when the memory map is flushed or deleted.
+
+    Parameters
+    ----------
+    path: str or PathLike
+        binary file path
+    shape: tuple of ints
+        array shape, (nrow, ncol) for structured grids and (ncpl,) for
+        vertex grids
+    text: str
+        array name written to the header (for example, "botm")
+    ilay: int, optional
+        one-based layer number written to the header (Default is 1)
+    dtype: numpy.dtype, optional
+        np.float64 for double precision arrays or np.int32 for integer
+        arrays (Default is np.float64)
+
+    Returns
+    -------
+    arr: numpy.memmap
+        writable memory map of the array data
+
+    """
+    shape = tuple(shape)
+    if len(shape) == 2:
+        m1, m2, bintype = shape[1], shape[0], "vardis"
+    else:
+        m1, m2, bintype = shape[0], 1, "vardisv"
+    header = flopy.utils.BinaryHeader.create(
+        bintype=bintype,
+        precision="double",
+        text=text.upper(),
+        m1=m1,
+        m2=m2,
+        m3=ilay,
+        pertim=1.0,
+        totim=1.0,
+        kstp=1,
+        kper=1,
+    )
+    path = pl.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        header.tofile(f)
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r+",
+        offset=header.dtype.itemsize,
+        shape=shape,
+    )
+
+
+def open_binary_array(
+    path: Union[str, os.PathLike],
+    shape: Tuple[int, ...],
+    dtype: np.dtype = np.float64,
+    mode: str = "r",
+) -> np.memmap:
+    """
+    Memory map the data in a single layer MODFLOW 6 binary input array
+    file created with create_binary_array()
+
+    Parameters
+    ----------
+    path: str or PathLike
+        binary file path
+    shape: tuple of ints
+        array shape
+    dtype: numpy.dtype, optional
+        array data type (Default is np.float64)
+    mode: str, optional
+        numpy.memmap mode (Default is "r")
+
+    Returns
+    -------
+    arr: numpy.memmap
+        memory map of the array data
+
+    """
+    offset = flopy.utils.BinaryHeader.set_dtype(
+        bintype="vardis", precision="double"
+    ).itemsize
+    return np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=shape)
+
+
+def _sample_raster_tile(
+    dataset,
+    band: int,
+    x: np.ndarray,
+    y: np.ndarray,
+    pad: int = 2,
+) -> np.ndarray:
+    """
+    Bilinear interpolation of a rasterio dataset band at x, y locations.
+    Only the raster window covering the locations is read. Nodata pixels
+    are replaced with the nearest valid pixel and locations outside of
+    the raster use the nearest edge pixel.
+    """
+    from rasterio.windows import Window
+    from scipy import ndimage
+
+    col, row = ~dataset.transform * (x, y)
+    # pixel center coordinates
+    col = np.asarray(col) - 0.5
+    row = np.asarray(row) - 0.5
+    r0 = int(np.clip(np.floor(row.min()) - pad, 0, dataset.height - 1))
+    r1 = int(np.clip(np.ceil(row.max()) + pad + 1, r0 + 1, dataset.height))
+    c0 = int(np.clip(np.floor(col.min()) - pad, 0, dataset.width - 1))
+    c1 = int(np.clip(np.ceil(col.max()) + pad + 1, c0 + 1, dataset.width))
+    arr = dataset.read(band, window=Window(c0, r0, c1 - c0, r1 - r0))
+    arr = arr.astype(float)
+
+    invalid = ~np.isfinite(arr)
+    if dataset.nodata is not None:
+        invalid |= np.isclose(arr, dataset.nodata)
+    if invalid.all():
+        return np.full(x.shape, np.nan, dtype=float)
+    elif invalid.any():
+        index = ndimage.distance_transform_edt(
+            invalid, return_distances=False, return_indices=True
+        )
+        arr = arr[tuple(index)]
+
+    return ndimage.map_coordinates(
+        arr,
+        (row - r0, col - c0),
+        order=1,
+        mode="nearest",
+    )
+
+
+def build_tiled_grid_arrays(
+    modelgrid: flopy.discretization.StructuredGrid,
+    raster_path: Union[str, os.PathLike],
+    boundary: List[tuple],
+    nlay: int,
+    dv0: float,
+    sim_ws: Union[str, os.PathLike],
+    growth_factor: float = 1.5,
+    min_thickness: float = None,
+    band: int = 1,
+    tile_rows: int = None,
+    idomain_method: str = "fraction",
+    basename: str = "model",
+) -> dict:
+    """
+    Build the top, botm, idomain, and strt arrays for a structured
+    watershed grid one tile of rows at a time. Land surface elevations
+    are bilinearly interpolated from the raster, the idomain is set
+    using the boundary polygon, and layer bottoms are set using
+    layer_elevations(). Starting heads are set to the land surface
+    elevation. Tiles are written directly to memory-mapped MODFLOW 6
+    binary files in the external subdirectory of sim_ws so memory use
+    is bounded by the tile size.
+
+    Parameters
+    ----------
+    modelgrid: flopy.discretization.StructuredGrid
+        flopy modelgrid object defining the horizontal discretization
+    raster_path: str or PathLike
+        land surface elevation raster
+    boundary: List(tuple)
+        list of x,y tuples defining the boundary of the active model domain.
+    nlay: int
+        number of layers
+    dv0: float
+        thickness of the top layer
+    sim_ws: str or PathLike
+        simulation workspace
+    growth_factor: float, optional
+        layer thickness multiplier (Default is 1.5)
+    min_thickness: float, optional
+        minimum layer thickness (Default is None)
+    band: int, optional
+        raster band (Default is 1)
+    tile_rows: int, optional
+        number of rows in each tile (Default is None, which uses tiles
+        with approximately 2**20 cells)
+    idomain_method: str, optional
+        "fraction" or "centers" (see set_structured_idomain). (Default
+        is "fraction")
+    basename: str, optional
+        base name of the binary files (Default is "model")
+
+    Returns
+    -------
+    griddata: dict
+        flopy external file specifications for the "top", "botm",
+        "idomain", and "strt" arrays that can be passed directly to
+        flopy.mf6.ModflowGwfdis and flopy.mf6.ModflowGwfic. Layered
+        arrays are lists with a specification for each layer. Each
+        specification also includes the "path" and "dtype" needed to
+        reopen the data with open_binary_array().
+
+    """
+    import rasterio
+
+    if modelgrid.grid_type != "structured":
+        raise ValueError(
+            f"modelgrid must be 'structured' not '{modelgrid.grid_type}'"
+        )
+    if idomain_method not in ("fraction", "centers"):
+        raise ValueError(
+            "idomain_method must be 'fraction' or 'centers' "
+            + f"not '{idomain_method}'"
+        )
+    nrow, ncol = modelgrid.nrow, modelgrid.ncol
+    if tile_rows is None:
+        tile_rows = max(1, 2**20 // ncol)
+
+    sim_ws = pl.Path(sim_ws)
+    ext_dir = sim_ws / "external"
+    griddata = {}
+    arrays = {}
+
+    def _create(name, text, ilay, dtype):
+        filename = f"{basename}.{name}.bin"
+        path = ext_dir / filename
+        arrays[name] = create_binary_array(
+            path, (nrow, ncol), text, ilay=ilay, dtype=dtype
+        )
+        return {
+            "filename": f"external/{filename}",
+            "binary": True,
+            "factor": 1.0,
+            "path": path,
+            "dtype": np.dtype(dtype),
+        }
+
+    griddata["top"] = _create("dis_top", "top", 1, np.float64)
+    for key, text, package, dtype in (
+        ("botm", "botm", "dis", np.float64),
+        ("idomain", "idomain", "dis", np.int32),
+        ("strt", "strt", "ic", np.float64),
+    ):
+        griddata[key] = [
+            _create(f"{package}_{text}_layer{k + 1}", text, k + 1, dtype)
+            for k in range(nlay)
+        ]
+
+    xedge, yedge = _structured_cell_edges(modelgrid)
+    xc = 0.5 * (xedge[:-1] + xedge[1:])
+    yc = 0.5 * (yedge[:-1] + yedge[1:])
+    with rasterio.open(raster_path) as dataset:
+        for i0 in range(0, nrow, tile_rows):
+            i1 = min(i0 + tile_rows, nrow)
+            x, y = _structured_tile_xy(modelgrid, xc, yc[i0:i1])
+            top = _sample_raster_tile(dataset, band, x, y)
+            mask = _structured_tile_mask(
+                modelgrid, boundary, xedge, yedge[i0 : i1 + 1], idomain_method
+            )
+            idomain = (mask > 0).astype(np.int32)
+
+            botm = layer_elevations(
+                top, nlay, dv0, growth_factor, min_thickness
+            )[1]
+
+            arrays["dis_top"][i0:i1] = top
+            for k in range(nlay):
+                layer = k + 1
+                arrays[f"dis_botm_layer{layer}"][i0:i1] = botm[k]
+                arrays[f"dis_idomain_layer{layer}"][i0:i1] = idomain
+                arrays[f"ic_strt_layer{layer}"][i0:i1] = top
+
+    for arr in arrays.values():
+        arr.flush()
+    return griddata
+
+
+def _cell_polygons(
+    modelgrid: Union[
+        flopy.discretization.StructuredGrid, flopy.discretization.VertexGrid
+    ],
+) -> np.ndarray:
+    """
+    Get shapely polygons for each cell in model coordinates
+    """
+    if modelgrid.grid_type == "structured":
+        xy = np.stack((modelgrid.xvertices, modelgrid.yvertices), axis=-1)
+        corners = np.stack(
+            (xy[1:, :-1], xy[1:, 1:], xy[:-1, 1:], xy[:-1, :-1]), axis=2
+        )
+        return shapely.polygons(corners.reshape(-1, 4, 2))
+    verts, index = _cell_vertex_index(modelgrid)
+    return shapely.polygons(verts[index])
+
+
+class RasterSampler:
+    """
+    Sparse raster pixel to model cell weights that resample a raster
+    band to a modelgrid with a single sparse matrix-vector product.
+    The weights reproduce flopy.utils.Raster.resample_to_grid for the
+    "nearest" and "linear" methods. The "mean" method averages the
+    pixels with centers in each cell.
+
+    Samplers are keyed by the raster geometry, the grid geometry, the
+    method, extrapolate_edges, and the raster nodata mask so the same
+    sampler can be applied to every band with the same nodata mask.
+
+    Parameters
+    ----------
+    weights: scipy.sparse.csr_matrix
+        weights with shape (ncells, raster nrow * raster ncol)
+    data_shape: tuple of ints
+        shape of the resampled array
+    key: str
+        sampler key
+    """
+
+    methods = ("nearest", "linear", "mean")
+
+    def __init__(self, weights, data_shape: Tuple[int, ...], key: str):
+        self.weights = weights.tocsr()
+        self.data_shape = tuple(data_shape)
+        self.key = key
+        self._empty = np.diff(self.weights.indptr) == 0
+
+    @staticmethod
+    def get_key(
+        raster: flopy.utils.Raster,
+        modelgrid: Union[
+            flopy.discretization.StructuredGrid,
+            flopy.discretization.VertexGrid,
+        ],
+        band: int,
+        method: str,
+        extrapolate_edges: bool,
+    ) -> str:
+        """
+        Calculate the sampler key for a raster band and a modelgrid
+
+        Parameters
+        ----------
+        raster: flopy.utils.Raster
+            flopy raster object
+        modelgrid: flopy.discretization.StructuredGrid
+            flopy modelgrid object
+        band: int
+            raster band
+        method: str
+            "nearest", "linear", or "mean"
+        extrapolate_edges: bool
+            fill cells without data using the nearest pixel
+
+        Returns
+        -------
+        key: str
+            hexadecimal sha1 digest
+        """
+        valid = np.isfinite(raster.get_array(band, masked=True))
+        sha = hashlib.sha1(grid_fingerprint(modelgrid).encode())
+        sha.update(np.array(tuple(raster.transform)[:6], dtype=float))
+        sha.update(str(valid.shape).encode())
+        sha.update(np.packbits(valid).tobytes())
+        sha.update(f"{method.lower()}{bool(extrapolate_edges)}".encode())
+        return sha.hexdigest()
+
+    @classmethod
+    def build(
+        cls,
+        raster: flopy.utils.Raster,
+        modelgrid: Union[
+            flopy.discretization.StructuredGrid,
+            flopy.discretization.VertexGrid,
+        ],
+        band: int,
+        method: str = "nearest",
+        extrapolate_edges: bool = False,
+    ):
+        """
+        Calculate the weights for a raster band and a modelgrid
+
+        Parameters
+        ----------
+        raster: flopy.utils.Raster
+            flopy raster object
+        modelgrid: flopy.discretization.StructuredGrid
+            flopy modelgrid object
+        band: int
+            raster band used to define the nodata mask
+        method: str, optional
+            "nearest", "linear", or "mean" (Default is "nearest")
+        extrapolate_edges: bool, optional
+            fill cells without data using the nearest pixel. This
+            option has no effect when using the "nearest" method.
+            (Default is False)
+
+        Returns
+        -------
+        sampler: RasterSampler
+        """
+        from scipy import sparse
+        from scipy.spatial import Delaunay, cKDTree
+
+        method = method.lower()
+        if method not in cls.methods:
+            raise ValueError(
+                f"method must be one of {cls.methods} not '{method}'"
+            )
+        key = cls.get_key(raster, modelgrid, band, method, extrapolate_edges)
+
+        valid = np.isfinite(raster.get_array(band, masked=True)).ravel()
+        pixels = np.flatnonzero(valid)
+        points = np.column_stack(
+            (raster.xcenters.ravel()[pixels], raster.ycenters.ravel()[pixels])
+        )
+        data_shape = modelgrid.xcellcenters.shape
+        xi = np.column_stack(
+            (
+                np.ravel(modelgrid.xcellcenters),
+                np.ravel(modelgrid.ycellcenters),
+            )
+        )
+        ncells = xi.shape[0]
+
+        if method == "nearest":
+            rows = np.arange(ncells)
+            cols = cKDTree(points).query(xi)[1]
+            values = np.ones(ncells, dtype=float)
+        elif method == "linear":
+            tri = Delaunay(points)
+            simplex = tri.find_simplex(xi)
+            inside = np.flatnonzero(simplex >= 0)
+            transform = tri.transform[simplex[inside]]
+            bary = np.einsum(
+                "nij,nj->ni",
+                transform[:, :2],
+                xi[inside] - transform[:, 2],
+            )
+            bary = np.column_stack((bary, 1.0 - bary.sum(axis=1)))
+            rows = np.repeat(inside, 3)
+            cols = tri.simplices[simplex[inside]].ravel()
+            values = bary.ravel()
+        else:
+            tree = shapely.STRtree(shapely.points(points))
+            cells, cols = tree.query(
+                _cell_polygons(modelgrid), predicate="covers"
+            )
+            # assign pixels on shared cell edges to a single cell
+            cols, first = np.unique(cols, return_index=True)
+            rows = cells[first]
+            count = np.bincount(rows, minlength=ncells)
+            values = 1.0 / count[rows]
+
+        if extrapolate_edges and method != "nearest":
+            empty = np.setdiff1d(np.arange(ncells), rows)
+            if empty.shape[0] > 0:
+                nearest = cKDTree(points).query(xi[empty])[1]
+                rows = np.concatenate((rows, empty))
+                cols = np.concatenate((cols, nearest))
+                values = np.concatenate((values, np.ones(empty.shape[0])))
+
+        weights = sparse.csr_matrix(
+            (values, (rows, pixels[cols])),
+            shape=(ncells, valid.shape[0]),
+        )
+        return cls(weights, data_shape, key)
+
+    def resample(self, array: np.ndarray) -> np.ndarray:
+        """
+        Resample a raster band array to the modelgrid
+
+        Parameters
+        ----------
+        array: numpy.ndarray
+            raster band array (for example, from Raster.get_array(band))
+
+        Returns
+        -------
+        data: numpy.ndarray
+            resampled data. Cells without data are set to nan.
+        """
+        array = np.asarray(array, dtype=float).ravel()
+        if array.shape[0] != self.weights.shape[1]:
+            raise ValueError(
+                f"array size ({array.shape[0]}) does not match the "
+                + f"sampler raster size ({self.weights.shape[1]})"
+            )
+        data = self.weights @ np.nan_to_num(array, nan=0.0)
+        data[self._empty] = np.nan
+        return data.reshape(self.data_shape)
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Save the sampler to a npz file
+
+        Parameters
+        ----------
+        path: str or PathLike
+            npz file path
+
+        Returns
+        -------
+        None
+        """
+        path = pl.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = _temp_path(path)
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                data=self.weights.data,
+                indices=self.weights.indices,
+                indptr=self.weights.indptr,
+                shape=self.weights.shape,
+                data_shape=self.data_shape,
+                key=self.key,
+            )
+        os.replace(temp_path, path)
+        return
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]):
+        """
+        Load a sampler saved with RasterSampler.save()
+
+        Parameters
+        ----------
+        path: str or PathLike
+            npz file path
+
+        Returns
+        -------
+        sampler: RasterSampler
+        """
+        from scipy import sparse
+
+        with np.load(path) as f:
+            weights = sparse.csr_matrix(
+                (f["data"], f["indices"], f["indptr"]),
+                shape=tuple(f["shape"]),
+            )
+            return cls(weights, tuple(f["data_shape"]), str(f["key"]))
+
+
+# raster samplers keyed by RasterSampler.get_key(), the least recently
+# used samplers are dropped once there are more than
+# _raster_sampler_cache_size samplers
+_raster_sampler_cache = OrderedDict()
+_raster_sampler_cache_size = 8
+
+# locks keyed by RasterSampler.get_key() so a sampler is only built once
+# when several threads need the same sampler, with the number of threads
+# using each lock. Locks are removed when no thread is using them.
+_raster_sampler_locks = {}
+_raster_sampler_lock = threading.Lock()
+
+
+def _cached_raster_sampler(key: str) -> Union[RasterSampler, None]:
+    with _raster_sampler_lock:
+        sampler = _raster_sampler_cache.get(key)
+        if sampler is not None:
+            _raster_sampler_cache.move_to_end(key)
+        return sampler
+
+
+def get_raster_sampler(
+    raster: flopy.utils.Raster,
+    modelgrid: Union[
+        flopy.discretization.StructuredGrid, flopy.discretization.VertexGrid
+    ],
+    band: int,
+    method: str = "nearest",
+    extrapolate_edges: bool = False,
+    cache_dir: Union[str, os.PathLike] = None,
+) -> RasterSampler:
+    """
+    Get a RasterSampler from memory, from cache_dir, or by calculating
+    the weights
+
+    Parameters
+    ----------
+    raster: flopy.utils.Raster
+        flopy raster object
+    modelgrid: flopy.discretization.StructuredGrid
+        flopy modelgrid object
+    band: int
+        raster band used to define the nodata mask
+    method: str, optional
+        "nearest", "linear", or "mean" (Default is "nearest")
+    extrapolate_edges: bool, optional
+        fill cells without data using the nearest pixel (Default is False)
+    cache_dir: str or PathLike, optional
+        directory used to save samplers (Default is None, which only
+        keeps samplers in memory)
+
+    Returns
+    -------
+    sampler: RasterSampler
+    """
+    key = RasterSampler.get_key(
+        raster, modelgrid, band, method, extrapolate_edges
+    )
+    sampler = _cached_raster_sampler(key)
+    if sampler is not None:
+        return sampler
+
+    with _raster_sampler_lock:
+        lock, nusers = _raster_sampler_locks.get(key, (threading.Lock(), 0))
+        _raster_sampler_locks[key] = (lock, nusers + 1)
+    try:
+        with lock:
+            sampler = _cached_raster_sampler(key)
+            if sampler is not None:
+                return sampler
+            path = None
+            if cache_dir is not None:
+                path = pl.Path(cache_dir) / f"sampler_{key}.npz"
+                if path.is_file():
+                    sampler = RasterSampler.load(path)
+            if sampler is None:
+                sampler = RasterSampler.build(
+                    raster, modelgrid, band, method, extrapolate_edges
+                )
+                if path is not None:
+                    sampler.save(path)
+            with _raster_sampler_lock:
+                _raster_sampler_cache[key] = sampler
+                while len(_raster_sampler_cache) > _raster_sampler_cache_size:
+                    _raster_sampler_cache.popitem(last=False)
+    finally:
+        with _raster_sampler_lock:
+            lock, nusers = _raster_sampler_locks[key]
+            if nusers == 1:
+                del _raster_sampler_locks[key]
+            else:
+                _raster_sampler_locks[key] = (lock, nusers - 1)
+    return sampler
+
+
+def clear_raster_sampler_cache() -> None:
+    """
+    Clear raster samplers kept in memory. Samplers saved to a cache_dir
+    are not removed.
+
+    Returns
+    -------
+    None
+
+    """
+    with _raster_sampler_lock:
+        _raster_sampler_cache.clear()
+    return
+
+
+def resample_to_grid(
+    raster: flopy.utils.Raster,
+    modelgrid: Union[
+        flopy.discretization.StructuredGrid, flopy.discretization.VertexGrid
+    ],
+    band: int,
+    method: str = "nearest",
+    extrapolate_edges: bool = False,
+    cache_dir: Union[str, os.PathLike] = None,
+) -> np.ndarray:
+    """
+    Resample a raster band to a modelgrid using a cached RasterSampler.
+    Equivalent to raster.resample_to_grid() for the "nearest" and
+    "linear" methods, except that cells without data are set to nan.
+
+    Parameters
+    ----------
+    raster: flopy.utils.Raster
+        flopy raster object
+    modelgrid: flopy.discretization.StructuredGrid
+        flopy modelgrid object
+    band: int
+        raster band
+    method: str, optional
+        "nearest", "linear", or "mean" (Default is "nearest")
+    extrapolate_edges: bool, optional
+        fill cells without data using the nearest pixel (Default is False)
+    cache_dir: str or PathLike, optional
+        directory used to save samplers (Default is None, which only
+        keeps samplers in memory)
+
+    Returns
+    -------
+    data: numpy.ndarray
+        resampled data
+    """
+    sampler = get_raster_sampler(
+        raster, modelgrid, band, method, extrapolate_edges, cache_dir
+    )
+    return sampler.resample(raster.get_array(band, masked=True))
+
+
+def _resample_raster_file(
+    path: Union[str, os.PathLike],
+    modelgrid: Union[
+        flopy.discretization.StructuredGrid, flopy.discretization.VertexGrid
+    ],
+    method: str,
+    band: int,
+    extrapolate_edges: bool,
+    cache_dir: Union[str, os.PathLike],
+) -> np.ndarray:
+    """
+    Load a raster and resample a band to the modelgrid
+    """
+    raster = flopy.utils.Raster.load(path)
+    if band is None:
+        band = raster.bands[0]
+    return resample_to_grid(
+        raster, modelgrid, band, method, extrapolate_edges, cache_dir
+    )
+
+
+def resample_rasters(
+    rasters: dict,
+    modelgrid: Union[
+        flopy.discretization.StructuredGrid, flopy.discretization.VertexGrid
+    ],
+    max_workers: int = None,
+    cache_dir: Union[str, os.PathLike] = None,
+) -> dict:
+    """
+    Load and resample several rasters to a modelgrid concurrently
+
+    Parameters
+    ----------
+    rasters: dict
+        dictionary with raster paths as keys and (method, band,
+        extrapolate_edges) tuples as values. band can be None to use the
+        first raster band.
+    modelgrid: flopy.discretization.StructuredGrid
+        flopy modelgrid object
+    max_workers: int, optional
+        maximum number of threads (Default is None, which uses the
+        ThreadPoolExecutor default)
+    cache_dir: str or PathLike, optional
+        directory used to save raster samplers (Default is None, which
+        only keeps samplers in memory)
+
+    Returns
+    -------
+    data: dict
+        dictionary with the raster paths as keys and the resampled cell
+        arrays as values
+
+    Examples
+    --------
+    >>> data = resample_rasters(
+    ...     {
+    ...         "top_SI.tif": ("linear", None, True),
+    ...         "k_aq_SI.tif": ("nearest", None, True),
+    ...     },
+    ...     voronoi_grid,
+    ... )
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            key: executor.submit(
+                _resample_raster_file,
+                key,
+                modelgrid,
+                method,
+                band,
+                extrapolate_edges,
+                cache_dir,
+            )
+            for key, (method, band, extrapolate_edges) in rasters.items()
+        }
+        data = {key: future.result() for key, future in futures.items()}
+    return data
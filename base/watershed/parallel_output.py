@@ -0,0 +1,1058 @@
+import json
+import os
+import pathlib as pl
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple, Union
+
+import flopy
+import numpy as np
+import pandas as pd
+
+# MODFLOW 6 double precision array record header
+header_dtype = np.dtype(
+    [
+        ("kstp", "<i4"),
+        ("kper", "<i4"),
+        ("pertim", "<f8"),
+        ("totim", "<f8"),
+        ("text", "S16"),
+        ("ncol", "<i4"),
+        ("nrow", "<i4"),
+        ("ilay", "<i4"),
+    ]
+)
+
+# header index with the file offset of the data in each record
+index_dtype = np.dtype(header_dtype.descr + [("offset", "<i8")])
+
+
+def index_head_file(path: Union[str, os.PathLike]) -> np.ndarray:
+    """
+    Read the record headers of a double precision MODFLOW 6 head (or
+    other dependent variable) file without reading the data
+
+    Parameters
+    ----------
+    path: str or PathLike
+        head file path
+
+    Returns
+    -------
+    index: numpy.ndarray
+        structured array with the header of every record and the file
+        offset of the record data
+    """
+    size = os.path.getsize(path)
+    headers = []
+    offsets = []
+    with open(path, "rb") as f:
+        position = 0
+        while position < size:
+            header = np.fromfile(f, dtype=header_dtype, count=1)
+            if header.shape[0] == 0:
+                break
+            position += header_dtype.itemsize
+            headers.append(header[0])
+            offsets.append(position)
+            position += 8 * int(header["ncol"][0]) * int(header["nrow"][0])
+            f.seek(position)
+    index = np.zeros(len(headers), dtype=index_dtype)
+    if headers:
+        headers = np.array(headers, dtype=header_dtype)
+        for name in header_dtype.names:
+            index[name] = headers[name]
+        index["offset"] = offsets
+    return index
+
+
+def save_node_mapping(
+    mfsplit: flopy.mf6.utils.Mf6Splitter,
+    path: Union[str, os.PathLike],
+) -> None:
+    """
+    Save the node mapping of a Mf6Splitter object to a compact npz file
+    of int32 arrays. The file is a binary alternative to the json file
+    written by Mf6Splitter.save_node_mapping() and can be loaded with
+    load_node_mapping() without the original simulation.
+
+    Parameters
+    ----------
+    mfsplit: flopy.mf6.utils.Mf6Splitter
+        splitter object used to split the simulation
+    path: str or PathLike
+        npz file path
+
+    Returns
+    -------
+    None
+    """
+    modelgrid = mfsplit.original_modelgrid
+    reversed_map = mfsplit.reversed_node_map
+    models = np.array(sorted(reversed_map), dtype=np.int32)
+    counts = np.array([len(reversed_map[m]) for m in models], dtype=np.int64)
+    offsets = np.zeros(models.shape[0] + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+    local = np.empty(offsets[-1], dtype=np.int32)
+    original = np.empty(offsets[-1], dtype=np.int32)
+    for i, mkey in enumerate(models):
+        mapping = reversed_map[mkey]
+        n = counts[i]
+        nodes = np.fromiter(mapping.keys(), dtype=np.int32, count=n)
+        order = np.argsort(nodes)
+        local[offsets[i] : offsets[i + 1]] = nodes[order]
+        original[offsets[i] : offsets[i + 1]] = np.fromiter(
+            mapping.values(), dtype=np.int32, count=n
+        )[order]
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            models=models,
+            offsets=offsets,
+            local=local,
+            original=original,
+            shape=np.array(modelgrid.shape, dtype=np.int64),
+            ncpl=np.int64(modelgrid.ncpl),
+            grid_type=np.array(modelgrid.grid_type),
+        )
+    return
+
+
+def load_node_mapping(path: Union[str, os.PathLike]) -> dict:
+    """
+    Load a node mapping json file saved with
+    Mf6Splitter.save_node_mapping() or a npz file saved with
+    save_node_mapping()
+
+    Parameters
+    ----------
+    path: str or PathLike
+        node mapping json or npz file path
+
+    Returns
+    -------
+    mapping: dict
+        dictionary with the original "shape", "ncpl", and "grid_type" and
+        "nodes", a dictionary of (local nodes, original nodes) plan view
+        node arrays keyed by model number
+    """
+    if pl.Path(path).suffix.lower() == ".npz":
+        with np.load(path) as f:
+            local = f["local"]
+            original = f["original"]
+            offsets = f["offsets"]
+            nodes = {
+                int(mkey): (
+                    local[offsets[i] : offsets[i + 1]],
+                    original[offsets[i] : offsets[i + 1]],
+                )
+                for i, mkey in enumerate(f["models"])
+            }
+            return {
+                "shape": tuple(int(n) for n in f["shape"]),
+                "ncpl": int(f["ncpl"]),
+                "grid_type": str(f["grid_type"]),
+                "nodes": nodes,
+            }
+
+    with open(path) as f:
+        json_dict = json.load(f)
+    items = json_dict["node_map"].items()
+    original = np.fromiter((int(k) for k, _ in items), dtype=int)
+    model_node = np.array([v for _, v in items], dtype=int).reshape(-1, 2)
+    nodes = {}
+    for mkey in np.unique(model_node[:, 0]):
+        idx = np.flatnonzero(model_node[:, 0] == mkey)
+        order = np.argsort(model_node[idx, 1])
+        nodes[int(mkey)] = (model_node[idx, 1][order], original[idx][order])
+    return {
+        "shape": tuple(json_dict["shape"]),
+        "ncpl": int(json_dict["original_ncpl"]),
+        "grid_type": json_dict["grid_type"],
+        "nodes": nodes,
+    }
+
+
+def reconstruct_array(
+    arrays: Dict[int, np.ndarray],
+    node_mapping: Union[str, os.PathLike, dict],
+    fill_value: float = 0.0,
+) -> np.ndarray:
+    """
+    Reconstruct split model arrays into a single array with the shape
+    of the original model. Unlike Mf6Splitter.reconstruct_array(), the
+    original simulation does not need to be loaded.
+
+    Parameters
+    ----------
+    arrays: dict
+        split model arrays with the shape (nlay, ...) keyed by model
+        number
+    node_mapping: str, PathLike, or dict
+        node mapping json or npz file, or a mapping returned by
+        load_node_mapping()
+    fill_value: float, optional
+        value assigned to cells that are not in a split model (Default is
+        0.0, which matches Mf6Splitter.reconstruct_array())
+
+    Returns
+    -------
+    array: numpy.ndarray
+        reconstructed array
+    """
+    if not isinstance(node_mapping, dict):
+        node_mapping = load_node_mapping(node_mapping)
+    shape = node_mapping["shape"]
+    dtype = np.result_type(*arrays.values())
+    array = np.full((shape[0], node_mapping["ncpl"]), fill_value, dtype=dtype)
+    for mkey, values in arrays.items():
+        local, original = node_mapping["nodes"][mkey]
+        values = np.asarray(values).reshape(shape[0], -1)
+        array[:, original] = values[:, local]
+    return array.reshape(shape)
+
+
+def get_head_files(
+    simulation: flopy.mf6.MFSimulation,
+) -> Dict[int, pl.Path]:
+    """
+    Get the head file path of every model in a split simulation
+
+    Parameters
+    ----------
+    simulation: flopy.mf6.MFSimulation
+        split flopy mf6 simulation object
+
+    Returns
+    -------
+    head_files: dict
+        head file paths keyed by model number
+    """
+    return {
+        int(model_name.split("_")[-1]): path
+        for model_name, path in _output_files(
+            simulation, "head_filerecord"
+        ).items()
+    }
+
+
+def get_budget_files(
+    simulation: flopy.mf6.MFSimulation,
+) -> Dict[int, pl.Path]:
+    """
+    Get the budget file path of every model in a split simulation
+
+    Parameters
+    ----------
+    simulation: flopy.mf6.MFSimulation
+        split flopy mf6 simulation object
+
+    Returns
+    -------
+    budget_files: dict
+        budget file paths keyed by model number
+    """
+    return {
+        int(model_name.split("_")[-1]): path
+        for model_name, path in _output_files(
+            simulation, "budget_filerecord"
+        ).items()
+    }
+
+
+def _output_files(
+    simulation: flopy.mf6.MFSimulation,
+    record_name: str,
+) -> Dict[str, pl.Path]:
+    """
+    Get an output control file path of every model keyed by model name
+    """
+    sim_ws = pl.Path(simulation.sim_path)
+    files = {}
+    for model_name in simulation.model_names:
+        model = simulation.get_model(model_name)
+        record = getattr(model.oc, record_name).get_data()
+        files[model_name] = sim_ws / record[0][0]
+    return files
+
+
+def _time_steps(index: np.ndarray) -> np.ndarray:
+    """
+    Get the position of the first record of each time step in a head
+    file index, with the number of records appended
+    """
+    new_step = (index["kstp"][1:] != index["kstp"][:-1]) | (
+        index["kper"][1:] != index["kper"][:-1]
+    )
+    first = np.flatnonzero(np.concatenate(([True], new_step)))
+    return np.append(first, index.shape[0])
+
+
+def reconstruct_heads(
+    head_files: Dict[int, Union[str, os.PathLike]],
+    node_mapping: Union[str, os.PathLike, dict],
+    output: Union[str, os.PathLike],
+    hnoflo: float = 1e30,
+) -> np.ndarray:
+    """
+    Reconstruct the heads of a split simulation for every time step into
+    a memory-mapped numpy file (.npy) or a single MODFLOW 6 head file
+    (.hds). One time step of the original model and one layer record of
+    a split model are held in memory at a time.
+
+    Parameters
+    ----------
+    head_files: dict
+        head file paths keyed by model number (see get_head_files())
+    node_mapping: str, PathLike, or dict
+        node mapping json file saved with Mf6Splitter.save_node_mapping()
+        or a mapping returned by load_node_mapping()
+    output: str or PathLike
+        output file path. A .npy file is written as a memory-mapped array
+        with the shape (ntimes, nlay, nrow, ncol) or (ntimes, nlay, ncpl).
+        Any other suffix is written as a head file.
+    hnoflo: float, optional
+        value assigned to cells that are not in a split model (Default is
+        1e30)
+
+    Returns
+    -------
+    times: numpy.ndarray
+        simulation time of each reconstructed time step
+    """
+    if not isinstance(node_mapping, dict):
+        node_mapping = load_node_mapping(node_mapping)
+    shape = node_mapping["shape"]
+    ncpl = node_mapping["ncpl"]
+    nlay = shape[0]
+
+    indexes = {mkey: get_head_index(path) for mkey, path in head_files.items()}
+    bounds = {mkey: _time_steps(index) for mkey, index in indexes.items()}
+    first_key = next(iter(indexes))
+    for mkey, index in indexes.items():
+        if index.shape[0] == 0 or not np.array_equal(
+            index["totim"][bounds[mkey][:-1]],
+            indexes[first_key]["totim"][bounds[first_key][:-1]],
+        ):
+            raise ValueError(
+                f"head file for model {mkey} does not have the same time "
+                + f"steps as the head file for model {first_key}"
+            )
+    headers = indexes[first_key][bounds[first_key][:-1]]
+    ntimes = headers.shape[0]
+
+    output = pl.Path(output)
+    write_npy = output.suffix.lower() == ".npy"
+    if write_npy:
+        result = np.lib.format.open_memmap(
+            output, mode="w+", dtype=np.float64, shape=(ntimes, *shape)
+        )
+        result_flat = result.reshape(ntimes, nlay, ncpl)
+    else:
+        fout = open(output, "wb")
+        if node_mapping["grid_type"] == "structured":
+            nrow, ncol = shape[1], shape[2]
+        else:
+            nrow, ncol = 1, ncpl
+
+    files = {mkey: open(head_files[mkey], "rb") for mkey in head_files}
+    try:
+        step_array = np.empty((nlay, ncpl), dtype=np.float64)
+        for istep in range(ntimes):
+            step_array.fill(hnoflo)
+            for mkey, index in indexes.items():
+                local, original = node_mapping["nodes"][mkey]
+                records = index[bounds[mkey][istep] : bounds[mkey][istep + 1]]
+                f = files[mkey]
+                for record in records:
+                    f.seek(record["offset"])
+                    data = np.fromfile(
+                        f,
+                        dtype="<f8",
+                        count=int(record["ncol"]) * int(record["nrow"]),
+                    )
+                    step_array[record["ilay"] - 1, original] = data[local]
+            if write_npy:
+                result_flat[istep] = step_array
+            else:
+                header = headers[istep]
+                for k in range(nlay):
+                    record = np.array(
+                        (
+                            header["kstp"],
+                            header["kper"],
+                            header["pertim"],
+                            header["totim"],
+                            header["text"],
+                            ncol,
+                            nrow,
+                            k + 1,
+                        ),
+                        dtype=header_dtype,
+                    )
+                    record.tofile(fout)
+                    step_array[k].tofile(fout)
+    finally:
+        for f in files.values():
+            f.close()
+        if write_npy:
+            result.flush()
+            del result
+        else:
+            fout.close()
+    return headers["totim"].copy()
+
+
+# head file indexes and budget file objects keyed by the kind of file and
+# its path. Only the entry for the current modification time and size of
+# a file is kept, and the least recently used entries are dropped once
+# there are more than _output_file_cache_size entries so budget file
+# handles are not left open
+_output_file_cache = OrderedDict()
+_output_file_cache_size = 32
+
+
+def _close_cached(key: tuple, value) -> None:
+    if key[0] == "budget":
+        value.close()
+
+
+def _get_cached_output(kind: str, path: Union[str, os.PathLike], build):
+    stat = os.stat(path)
+    key = (kind, str(pl.Path(path).resolve()))
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    entry = _output_file_cache.pop(key, None)
+    if entry is not None and entry[0] != stamp:
+        _close_cached(key, entry[1])
+        entry = None
+    if entry is None:
+        entry = (stamp, build(path))
+    _output_file_cache[key] = entry
+    while len(_output_file_cache) > _output_file_cache_size:
+        old_key, (_, old_value) = _output_file_cache.popitem(last=False)
+        _close_cached(old_key, old_value)
+    return entry[1]
+
+
+def get_head_index(path: Union[str, os.PathLike]) -> np.ndarray:
+    """
+    Get the cached record header index of a head file. The index is
+    rebuilt if the file has changed.
+
+    Parameters
+    ----------
+    path: str or PathLike
+        head file path
+
+    Returns
+    -------
+    index: numpy.ndarray
+        head file index (see index_head_file())
+    """
+    return _get_cached_output("head", path, index_head_file)
+
+
+def get_budget_file(
+    path: Union[str, os.PathLike],
+) -> flopy.utils.CellBudgetFile:
+    """
+    Get a cached flopy CellBudgetFile object. The record index of the
+    budget file is built when the object is created and reused for
+    later reads. A new object is created, and the previous object is
+    closed, if the file has changed.
+
+    Parameters
+    ----------
+    path: str or PathLike
+        budget file path
+
+    Returns
+    -------
+    cbc: flopy.utils.CellBudgetFile
+    """
+    return _get_cached_output("budget", path, flopy.utils.CellBudgetFile)
+
+
+def clear_output_file_cache() -> None:
+    """
+    Close cached budget files and remove all cached head file indexes
+
+    Returns
+    -------
+    None
+    """
+    for key, (_, value) in _output_file_cache.items():
+        _close_cached(key, value)
+    _output_file_cache.clear()
+    return
+
+
+def read_head_file(
+    path: Union[str, os.PathLike],
+    totims: Sequence[float] = None,
+) -> Dict[float, np.ndarray]:
+    """
+    Read the heads for several times from a head file using the cached
+    record header index
+
+    Parameters
+    ----------
+    path: str or PathLike
+        head file path
+    totims: sequence of floats, optional
+        simulation times to read (Default is None, which reads every
+        time)
+
+    Returns
+    -------
+    heads: dict
+        head arrays with the shape (nlay, nrow, ncol) or (nlay, ncpl)
+        keyed by simulation time
+    """
+    index = get_head_index(path)
+    bounds = _time_steps(index)
+    times = index["totim"][bounds[:-1]]
+    if totims is None:
+        totims = times
+    heads = {}
+    with open(path, "rb") as f:
+        for totim in totims:
+            istep = np.flatnonzero(np.isclose(times, totim))
+            if istep.shape[0] == 0:
+                raise ValueError(f"totim {totim} not in '{path}'")
+            records = index[bounds[istep[0]] : bounds[istep[0] + 1]]
+            nrow, ncol = int(records["nrow"][0]), int(records["ncol"][0])
+            shape = (ncol,) if nrow == 1 else (nrow, ncol)
+            data = np.empty((records["ilay"].max(), *shape))
+            for record in records:
+                f.seek(record["offset"])
+                data[record["ilay"] - 1] = np.fromfile(
+                    f, dtype="<f8", count=nrow * ncol
+                ).reshape(shape)
+            heads[float(times[istep[0]])] = data
+    return heads
+
+
+def read_budget_file(
+    path: Union[str, os.PathLike],
+    text: str,
+    totims: Sequence[float] = None,
+) -> dict:
+    """
+    Read a budget term for several times from a cached budget file
+
+    Parameters
+    ----------
+    path: str or PathLike
+        budget file path
+    text: str
+        budget term (for example, "FLOW-JA-FACE" or "DRN")
+    totims: sequence of floats, optional
+        simulation times to read (Default is None, which reads every
+        time)
+
+    Returns
+    -------
+    budget: dict
+        budget data returned by CellBudgetFile.get_data() keyed by
+        simulation time
+    """
+    cbc = get_budget_file(path)
+    if totims is None:
+        totims = cbc.get_times()
+    return {
+        float(totim): cbc.get_data(text=text, totim=totim) for totim in totims
+    }
+
+
+def read_partition_output(
+    simulation: flopy.mf6.MFSimulation,
+    kind: str = "head",
+    text: str = None,
+    totims: Sequence[float] = None,
+    max_workers: int = None,
+) -> Dict[str, dict]:
+    """
+    Read the head or budget output of every model in a split simulation
+    concurrently
+
+    Parameters
+    ----------
+    simulation: flopy.mf6.MFSimulation
+        split flopy mf6 simulation object
+    kind: str, optional
+        "head" or "budget" (Default is "head")
+    text: str, optional
+        budget term, required if kind is "budget" (Default is None)
+    totims: sequence of floats, optional
+        simulation times to read (Default is None, which reads every
+        time)
+    max_workers: int, optional
+        maximum number of threads (Default is None, which uses the
+        ThreadPoolExecutor default)
+
+    Returns
+    -------
+    output: dict
+        dictionary keyed by model name of dictionaries of arrays keyed
+        by simulation time
+    """
+    if kind == "head":
+        files = _output_files(simulation, "head_filerecord")
+        args = {name: (path, totims) for name, path in files.items()}
+        reader = read_head_file
+    elif kind == "budget":
+        if text is None:
+            raise ValueError("text must be specified to read budget data")
+        files = _output_files(simulation, "budget_filerecord")
+        args = {name: (path, text, totims) for name, path in files.items()}
+        reader = read_budget_file
+    else:
+        raise ValueError(f"kind must be 'head' or 'budget' not '{kind}'")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            name: executor.submit(reader, *value)
+            for name, value in args.items()
+        }
+        output = {name: future.result() for name, future in futures.items()}
+
+    times = [tuple(value.keys()) for value in output.values()]
+    if len(set(times)) > 1:
+        raise ValueError("model output files do not have the same times")
+    return output
+
+
+# columns of the difference statistics returned by compare_heads() and
+# compare_budgets()
+comparison_columns = (
+    "kind",
+    "text",
+    "totim",
+    "kstp",
+    "kper",
+    "layer",
+    "model",
+    "count",
+    "max_abs",
+    "sum_sq",
+    "max_ref",
+    "inactive_mismatch",
+)
+
+
+def _difference_stats(
+    values: np.ndarray,
+    reference: np.ndarray,
+    inactive: float = np.inf,
+) -> tuple:
+    """
+    Get the number of compared cells, the maximum absolute difference,
+    the sum of squared differences, the maximum absolute reference value,
+    and the number of cells that are inactive in only one array. Cells
+    with an absolute value of at least inactive are not compared.
+    """
+    inactive_values = np.abs(values) >= inactive
+    inactive_reference = np.abs(reference) >= inactive
+    active = ~(inactive_values | inactive_reference)
+    count = int(np.count_nonzero(active))
+    if count:
+        diff = values[active] - reference[active]
+        max_abs = float(np.abs(diff).max())
+        sum_sq = float(np.dot(diff, diff))
+        max_ref = float(np.abs(reference[active]).max())
+    else:
+        max_abs = sum_sq = max_ref = 0.0
+    mismatch = int(np.count_nonzero(inactive_values != inactive_reference))
+    return count, max_abs, sum_sq, max_ref, mismatch
+
+
+def _comparison_frame(rows: dict) -> pd.DataFrame:
+    """
+    Create a comparison DataFrame from a dictionary of column lists and
+    add the root mean square difference
+    """
+    df = pd.DataFrame(rows, columns=list(comparison_columns))
+    count = df["count"].to_numpy()
+    df["rms"] = np.sqrt(
+        np.divide(
+            df["sum_sq"].to_numpy(),
+            count,
+            out=np.zeros(count.shape[0]),
+            where=count > 0,
+        )
+    )
+    return df
+
+
+def compare_heads(
+    serial_file: Union[str, os.PathLike],
+    head_files: Dict[int, Union[str, os.PathLike]],
+    node_mapping: Union[str, os.PathLike, dict],
+    hnoflo: float = 1e30,
+) -> pd.DataFrame:
+    """
+    Compare the heads of a serial simulation with the heads of the split
+    models of the parallel simulation for every time step. The files are
+    streamed one layer record at a time, so the memory use does not
+    depend on the number of time steps.
+
+    Parameters
+    ----------
+    serial_file: str or PathLike
+        head file of the serial simulation
+    head_files: dict
+        head file paths of the parallel simulation keyed by model number
+        (see get_head_files())
+    node_mapping: str, PathLike, or dict
+        node mapping json or npz file, or a mapping returned by
+        load_node_mapping()
+    hnoflo: float, optional
+        cells with an absolute head of at least hnoflo (inactive and dry
+        cells) are not compared (Default is 1e30)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        difference statistics (see comparison_columns) for each time,
+        layer, and model, with the root mean square difference ("rms")
+    """
+    if not isinstance(node_mapping, dict):
+        node_mapping = load_node_mapping(node_mapping)
+    serial_index = get_head_index(serial_file)
+    serial_bounds = _time_steps(serial_index)
+    times = serial_index["totim"][serial_bounds[:-1]]
+    indexes = {mkey: get_head_index(path) for mkey, path in head_files.items()}
+    bounds = {mkey: _time_steps(index) for mkey, index in indexes.items()}
+    for mkey, index in indexes.items():
+        if index.shape[0] == 0 or not np.allclose(
+            index["totim"][bounds[mkey][:-1]], times
+        ):
+            raise ValueError(
+                f"head file for model {mkey} does not have the same time "
+                + "steps as the serial head file"
+            )
+
+    rows = {name: [] for name in comparison_columns}
+    files = {mkey: open(path, "rb") for mkey, path in head_files.items()}
+    try:
+        with open(serial_file, "rb") as fserial:
+            for istep in range(times.shape[0]):
+                records = serial_index[
+                    serial_bounds[istep] : serial_bounds[istep + 1]
+                ]
+                model_records = {
+                    mkey: {
+                        int(record["ilay"]): record
+                        for record in index[
+                            bounds[mkey][istep] : bounds[mkey][istep + 1]
+                        ]
+                    }
+                    for mkey, index in indexes.items()
+                }
+                for record in records:
+                    fserial.seek(record["offset"])
+                    serial = np.fromfile(
+                        fserial,
+                        dtype="<f8",
+                        count=int(record["ncol"]) * int(record["nrow"]),
+                    )
+                    layer = int(record["ilay"])
+                    for mkey, f in files.items():
+                        local, original = node_mapping["nodes"][mkey]
+                        model_record = model_records[mkey][layer]
+                        f.seek(model_record["offset"])
+                        values = np.fromfile(
+                            f,
+                            dtype="<f8",
+                            count=int(model_record["ncol"])
+                            * int(model_record["nrow"]),
+                        )
+                        stats = _difference_stats(
+                            values[local], serial[original], hnoflo
+                        )
+                        ids = (
+                            "head",
+                            record["text"].decode().strip(),
+                            float(record["totim"]),
+                            int(record["kstp"]),
+                            int(record["kper"]),
+                            layer,
+                            mkey,
+                        )
+                        for name, value in zip(
+                            comparison_columns, ids + stats
+                        ):
+                            rows[name].append(value)
+    finally:
+        for f in files.values():
+            f.close()
+    return _comparison_frame(rows)
+
+
+def _budget_values(
+    cbc: flopy.utils.CellBudgetFile,
+    text: str,
+    kstpkper: tuple,
+    nodes: int,
+    field: str = "q",
+) -> np.ndarray:
+    """
+    Get the cell flows of a budget term for a time step as an array with
+    one value per cell. Flows of list records (and of several packages
+    with the same term) in the same cell are summed. field is the list
+    record field that is summed.
+    """
+    recordarray = cbc.recordarray
+    select = np.flatnonzero(
+        (np.char.strip(recordarray["text"]) == text.encode())
+        & (recordarray["kstp"] == kstpkper[0] + 1)
+        & (recordarray["kper"] == kstpkper[1] + 1)
+    )
+    values = np.zeros(nodes)
+    for idx in select:
+        data = cbc.get_data(idx=int(idx))[0]
+        if data.dtype.names is not None:
+            values += np.bincount(
+                data["node"] - 1, weights=data[field], minlength=nodes
+            )
+        else:
+            values += np.asarray(data, dtype=float).ravel()
+    return values
+
+
+def _budget_fields(cbc: flopy.utils.CellBudgetFile, text: str) -> List[str]:
+    """
+    Get the list record fields of a budget term that are compared. The
+    values of DATA- terms (for example, DATA-SPDIS and DATA-SAT) are
+    saved in auxiliary fields (qx, qy, qz, and sat) and q is a
+    placeholder, so the auxiliary fields are compared instead of q.
+    """
+    if not text.upper().startswith("DATA-"):
+        return ["q"]
+    data = cbc.get_data(text=text, kstpkper=cbc.get_kstpkper()[0])[0]
+    return [
+        name for name in data.dtype.names if name not in ("node", "node2", "q")
+    ]
+
+
+def compare_budgets(
+    serial_file: Union[str, os.PathLike],
+    budget_files: Dict[int, Union[str, os.PathLike]],
+    node_mapping: Union[str, os.PathLike, dict],
+    texts: Sequence[str] = None,
+) -> pd.DataFrame:
+    """
+    Compare the cell flows of the budget terms of a serial simulation
+    with the cell flows of the split models of the parallel simulation
+    for every time step. One budget record is read at a time.
+
+    Parameters
+    ----------
+    serial_file: str or PathLike
+        budget file of the serial simulation
+    budget_files: dict
+        budget file paths of the parallel simulation keyed by model
+        number (see get_budget_files())
+    node_mapping: str, PathLike, or dict
+        node mapping json or npz file, or a mapping returned by
+        load_node_mapping()
+    texts: sequence of str, optional
+        budget terms to compare (Default is None, which compares every
+        term in the serial budget file except FLOW-JA-FACE. Connections
+        between split models are saved in the exchange budgets, so the
+        FLOW-JA-FACE records of the serial and split models differ and
+        FLOW-JA-FACE cannot be included in texts. The qx, qy, qz, and
+        sat fields of DATA- terms, such as DATA-SPDIS and DATA-SAT, are
+        compared as separate terms, for example "DATA-SPDIS QX".)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        difference statistics (see comparison_columns) for each budget
+        term, time, layer, and model, with the root mean square difference
+        ("rms")
+    """
+    if texts is not None and any(
+        text.strip().upper() == "FLOW-JA-FACE" for text in texts
+    ):
+        raise ValueError(
+            "FLOW-JA-FACE cannot be compared because its records are "
+            + "sized by the connections of each model, and connections "
+            + "between split models are saved in the exchange budgets"
+        )
+    if not isinstance(node_mapping, dict):
+        node_mapping = load_node_mapping(node_mapping)
+    nlay, ncpl = node_mapping["shape"][0], node_mapping["ncpl"]
+    serial_cbc = get_budget_file(serial_file)
+    if texts is None:
+        texts = [
+            text.decode().strip()
+            for text in serial_cbc.textlist
+            if text.decode().strip() != "FLOW-JA-FACE"
+        ]
+    kstpkpers = serial_cbc.get_kstpkper()
+    times = serial_cbc.get_times()
+    cbcs = {mkey: get_budget_file(path) for mkey, path in budget_files.items()}
+    for mkey, cbc in cbcs.items():
+        if not np.allclose(cbc.get_times(), times):
+            raise ValueError(
+                f"budget file for model {mkey} does not have the same time "
+                + "steps as the serial budget file"
+            )
+
+    rows = {name: [] for name in comparison_columns}
+    for text, field in [
+        (text, field)
+        for text in texts
+        for field in _budget_fields(serial_cbc, text)
+    ]:
+        label = text if field == "q" else f"{text} {field.upper()}"
+        for totim, kstpkper in zip(times, kstpkpers):
+            serial = _budget_values(
+                serial_cbc, text, kstpkper, nlay * ncpl, field
+            ).reshape(nlay, ncpl)
+            for mkey, cbc in cbcs.items():
+                local, original = node_mapping["nodes"][mkey]
+                model_ncpl = cbc.nrow * cbc.ncol
+                values = _budget_values(
+                    cbc, text, kstpkper, cbc.nlay * model_ncpl, field
+                ).reshape(cbc.nlay, model_ncpl)
+                for k in range(nlay):
+                    stats = _difference_stats(
+                        values[k, local], serial[k, original]
+                    )
+                    ids = (
+                        "budget",
+                        label,
+                        float(totim),
+                        kstpkper[0] + 1,
+                        kstpkper[1] + 1,
+                        k + 1,
+                        mkey,
+                    )
+                    for name, value in zip(comparison_columns, ids + stats):
+                        rows[name].append(value)
+    return _comparison_frame(rows)
+
+
+def compare_outputs(
+    serial_simulation: flopy.mf6.MFSimulation,
+    parallel_simulation: flopy.mf6.MFSimulation,
+    node_mapping: Union[str, os.PathLike, dict],
+    hnoflo: float = 1e30,
+    texts: Sequence[str] = None,
+) -> pd.DataFrame:
+    """
+    Compare the head and budget output of a serial simulation and the
+    split parallel simulation (see compare_heads() and compare_budgets())
+
+    Parameters
+    ----------
+    serial_simulation: flopy.mf6.MFSimulation
+        serial flopy mf6 simulation with a single model
+    parallel_simulation: flopy.mf6.MFSimulation
+        split flopy mf6 simulation
+    node_mapping: str, PathLike, or dict
+        node mapping json or npz file, or a mapping returned by
+        load_node_mapping()
+    hnoflo: float, optional
+        cells with an absolute head of at least hnoflo are not compared
+        (Default is 1e30)
+    texts: sequence of str, optional
+        budget terms to compare (Default is None, see compare_budgets())
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        head and budget difference statistics
+    """
+    if not isinstance(node_mapping, dict):
+        node_mapping = load_node_mapping(node_mapping)
+    frames = []
+    for record_name, files, compare, kwargs in (
+        ("head_filerecord", get_head_files, compare_heads, {"hnoflo": hnoflo}),
+        (
+            "budget_filerecord",
+            get_budget_files,
+            compare_budgets,
+            {"texts": texts},
+        ),
+    ):
+        serial_file = next(
+            iter(_output_files(serial_simulation, record_name).values())
+        )
+        frames.append(
+            compare(
+                serial_file, files(parallel_simulation), node_mapping, **kwargs
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def tolerance_report(
+    df: pd.DataFrame,
+    head_atol: float = 1e-3,
+    budget_atol: float = 1e-6,
+    budget_rtol: float = 1e-3,
+) -> Tuple[pd.DataFrame, bool]:
+    """
+    Summarize the difference statistics of compare_outputs(),
+    compare_heads(), or compare_budgets() for each output type and budget
+    term and check the differences against tolerances. A term passes if
+    the maximum absolute difference is not greater than
+    atol + rtol * max_ref, where max_ref is the maximum absolute serial
+    value, and no cell is inactive in only one simulation.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        difference statistics
+    head_atol: float, optional
+        head tolerance (Default is 1e-3)
+    budget_atol: float, optional
+        absolute cell flow tolerance (Default is 1e-6)
+    budget_rtol: float, optional
+        cell flow tolerance relative to the largest serial cell flow of
+        the term (Default is 1e-3)
+
+    Returns
+    -------
+    report: pandas.DataFrame
+        maximum and root mean square differences, the tolerance, the
+        time, layer, and model with the largest difference, and "passed"
+        for each output type ("kind") and term ("text")
+    passed: bool
+        boolean indicating if every term passed
+    """
+    rows = []
+    for (kind, text), group in df.groupby(["kind", "text"], sort=False):
+        worst = group.loc[group["max_abs"].idxmax()]
+        max_ref = group["max_ref"].max()
+        if kind == "head":
+            tolerance = head_atol
+        else:
+            tolerance = budget_atol + budget_rtol * max_ref
+        count = group["count"].sum()
+        mismatch = int(group["inactive_mismatch"].sum())
+        rows.append(
+            {
+                "kind": kind,
+                "text": text,
+                "ntimes": group["totim"].nunique(),
+                "max_abs": worst["max_abs"],
+                "rms": np.sqrt(group["sum_sq"].sum() / count)
+                if count
+                else 0.0,
+                "tolerance": tolerance,
+                "totim": worst["totim"],
+                "layer": worst["layer"],
+                "model": worst["model"],
+                "inactive_mismatch": mismatch,
+                "passed": bool(
+                    worst["max_abs"] <= tolerance and mismatch == 0
+                ),
+            }
+        )
+    report = pd.DataFrame(rows)
+    return report, bool(report["passed"].all()) if rows else True
@@ -0,0 +1,1074 @@
+import contextlib
+import functools
+import hashlib
+import json
+import multiprocessing
+import os
+import pathlib as pl
+import re
+import shutil
+import stat
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple, Union
+
+import flopy
+import numpy as np
+import pandas as pd
+from defaults import get_cache_dir
+from flopy.mf6.mfbase import VerbosityLevel
+from flopy.mf6.utils import Mf6Splitter
+from parallel_output import save_node_mapping
+from partition import partition_model
+
+# suffixes of MODFLOW 6 output files that are not simulation input
+output_suffixes = (".lst", ".hds", ".cbc", ".bud", ".ucn", ".grb", ".csv")
+
+# simulation written by forked write_simulation_parallel() workers.
+# Forked worker processes inherit the simulation instead of unpickling a
+# copy. Thread workers are passed the simulation instead.
+_writer_simulation = None
+
+
+def _write_file(
+    simulation: flopy.mf6.MFSimulation, task: Tuple[str, Union[str, int]]
+) -> float:
+    """
+    Write the files of a model or an exchange of a simulation and return
+    the write time
+    """
+    kind, name = task
+    t0 = time.perf_counter()
+    if kind == "model":
+        simulation.get_model(name).write()
+    else:
+        list(simulation.exchange_files)[name].write()
+    return time.perf_counter() - t0
+
+
+def _write_forked_file(task: Tuple[str, Union[str, int]]) -> float:
+    """
+    Write the files of a model or an exchange of _writer_simulation in a
+    forked worker process and return the write time
+    """
+    return _write_file(_writer_simulation, task)
+
+
+@contextlib.contextmanager
+def _simulation_write_state(simulation: flopy.mf6.MFSimulation):
+    """
+    Set up the simulation data the way MFSimulation.write_simulation()
+    does before writing files and set the last accessed path after the
+    files are written. Mirrors MFSimulation.write_simulation() in
+    flopy 3.8 (the automatic max_columns_of_data from the DIS ncol and
+    the quiet verbosity of silent writes).
+    """
+    sim_data = simulation.simulation_data
+    if not sim_data.max_columns_user_set:
+        for model in simulation.model_dict.values():
+            dis = model.get_package("dis", type_only=True)
+            if dis is not None and hasattr(dis, "ncol"):
+                sim_data.max_columns_of_data = dis.ncol.get_data()
+                sim_data.max_columns_user_set = False
+                sim_data.max_columns_auto_set = True
+    saved_verbosity = sim_data.verbosity_level
+    sim_data.verbosity_level = VerbosityLevel.quiet
+    try:
+        yield
+    finally:
+        sim_data.verbosity_level = saved_verbosity
+    sim_data.mfpath.set_last_accessed_path()
+
+
+def write_simulation_parallel(
+    simulation: flopy.mf6.MFSimulation,
+    max_workers: int = None,
+    use_processes: bool = False,
+    silent: bool = False,
+) -> pd.DataFrame:
+    """
+    Write a simulation with the files of each model and exchange written
+    concurrently. The simulation name file, TDIS, solution, and other
+    simulation-level files are written first. Every file is written by a
+    single worker, so the files are the same as the files written by
+    MFSimulation.write_simulation() (except for the time stamp in the
+    file header).
+
+    Parameters
+    ----------
+    simulation: flopy.mf6.MFSimulation
+        flopy mf6 simulation
+    max_workers: int, optional
+        maximum number of workers (Default is None, which uses the
+        number of processors)
+    use_processes: bool, optional
+        write with forked worker processes instead of threads. The flopy
+        package writers are CPU-bound Python, so threads do not speed up
+        writes and processes are needed for a speedup. Forking is only
+        available on Linux and macOS and is not safe if other threads
+        are running (for example, in Jupyter kernels or on macOS), so
+        only use processes from a single-threaded script.
+        (Default is False)
+    silent: bool, optional
+        do not print the write time of each model and exchange
+        (Default is False)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        write time ("time", seconds) of each model and exchange ("name")
+        (models followed by exchanges)
+    """
+    global _writer_simulation
+
+    if use_processes and "fork" not in multiprocessing.get_all_start_methods():
+        raise ValueError("use_processes requires the fork start method")
+    t0 = time.perf_counter()
+    with _simulation_write_state(simulation):
+        simulation.name_file.write()
+        exchange_files = list(simulation.exchange_files)
+        for package in simulation.sim_package_list:
+            if package not in exchange_files:
+                package.write()
+
+        tasks = [("model", name) for name in simulation.model_names]
+        tasks += [("exchange", idx) for idx in range(len(exchange_files))]
+        if use_processes:
+            _writer_simulation = simulation
+            try:
+                with ProcessPoolExecutor(
+                    max_workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                ) as pool:
+                    times = list(pool.map(_write_forked_file, tasks))
+            finally:
+                _writer_simulation = None
+        else:
+            with ThreadPoolExecutor(max_workers) as pool:
+                times = list(
+                    pool.map(functools.partial(_write_file, simulation), tasks)
+                )
+    names = list(simulation.model_names)
+    names += [exchange.filename for exchange in exchange_files]
+
+    df = pd.DataFrame(
+        {
+            "name": names,
+            "type": [kind for kind, _ in tasks],
+            "time": times,
+        }
+    )
+    if not silent:
+        for row in df.itertuples():
+            print(f"  wrote {row.type} {row.name} in {row.time:.3f} s")
+        print(
+            f"wrote {len(df)} models and exchanges in "
+            + f"{time.perf_counter() - t0:.3f} s"
+        )
+    return df
+
+
+def _write_split(
+    parallel_sim: flopy.mf6.MFSimulation, use_processes: bool
+) -> None:
+    # threads do not speed up the CPU-bound package writers, so split
+    # simulations are only written concurrently with forked processes
+    if use_processes:
+        write_simulation_parallel(
+            parallel_sim, use_processes=True, silent=True
+        )
+    else:
+        parallel_sim.write_simulation(silent=True)
+
+
+def split_simulation(
+    simulation: flopy.mf6.MFSimulation,
+    nparts: int,
+    sim_ws: Union[str, os.PathLike],
+    method: str = "rcb",
+    use_processes: bool = False,
+) -> flopy.mf6.MFSimulation:
+    """
+    Split a single model simulation with a load-balanced split mask, add
+    the HPC file, and write the split simulation and the node mapping
+    file (mfsplit_node_mapping.npz) to sim_ws
+
+    Parameters
+    ----------
+    simulation: flopy.mf6.MFSimulation
+        flopy mf6 simulation with a single model
+    nparts: int
+        number of models to split the simulation into
+    sim_ws: str or PathLike
+        workspace for the split simulation
+    method: str, optional
+        partition_model() method (Default is "rcb")
+    use_processes: bool, optional
+        write the models and exchanges concurrently with forked processes
+        (see write_simulation_parallel()). Only use processes from a
+        single-threaded script. (Default is False)
+
+    Returns
+    -------
+    parallel_sim: flopy.mf6.MFSimulation
+        split simulation
+    """
+    sim_ws = pl.Path(sim_ws)
+    mfsplit = Mf6Splitter(simulation)
+    split_array = partition_model(simulation.get_model(), nparts, method)
+    parallel_sim = mfsplit.split_model(split_array)
+    partition_data = [
+        [model_name, i]
+        for i, model_name in enumerate(parallel_sim.model_names)
+    ]
+    flopy.mf6.ModflowUtlhpc(parallel_sim, partitions=partition_data)
+    parallel_sim.set_sim_path(sim_ws)
+    _write_split(parallel_sim, use_processes)
+    save_node_mapping(mfsplit, sim_ws / "mfsplit_node_mapping.npz")
+    return parallel_sim
+
+
+def simulation_input_files(
+    sim_ws: Union[str, os.PathLike],
+) -> List[pl.Path]:
+    """
+    Get the simulation input files in a workspace. MODFLOW 6 output files
+    (see output_suffixes) are skipped.
+
+    Parameters
+    ----------
+    sim_ws: str or PathLike
+        simulation workspace
+
+    Returns
+    -------
+    files: list of pathlib.Path
+        sorted input file paths relative to sim_ws, including files in
+        external data folders
+    """
+    sim_ws = pl.Path(sim_ws)
+    return sorted(
+        path.relative_to(sim_ws)
+        for path in sim_ws.rglob("*")
+        if path.is_file() and path.suffix.lower() not in output_suffixes
+    )
+
+
+def split_cache_key(
+    sim_ws: Union[str, os.PathLike],
+    split_array: np.ndarray,
+    hpc_partitions: Sequence[Sequence] = None,
+) -> str:
+    """
+    Get the split cache key of a simulation. The key is a hash of the
+    input files of the base simulation, the split mask, and the
+    ModflowUtlhpc partitions.
+
+    Parameters
+    ----------
+    sim_ws: str or PathLike
+        workspace of the base simulation. The input files on disk are
+        hashed so the simulation should be written before the key is
+        calculated.
+    split_array: numpy.ndarray
+        split mask passed to Mf6Splitter.split_model()
+    hpc_partitions: sequence of sequences, optional
+        ModflowUtlhpc partitions ([model, rank] pairs). None is used for
+        simulations without a HPC file. (Default is None)
+
+    Returns
+    -------
+    key: str
+        split cache key
+    """
+    sim_ws = pl.Path(sim_ws)
+    split_array = np.ascontiguousarray(split_array, dtype=np.int64)
+    sha = hashlib.sha1()
+    for path in simulation_input_files(sim_ws):
+        sha.update(path.as_posix().encode())
+        with open(sim_ws / path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+    sha.update(str(split_array.shape).encode())
+    sha.update(split_array.tobytes())
+    sha.update(json.dumps(hpc_partitions, default=str).encode())
+    sha.update(flopy.__version__.encode())
+    return sha.hexdigest()
+
+
+def split_cache_entry(
+    key: str,
+    cache_dir: Union[str, os.PathLike] = None,
+) -> pl.Path:
+    """
+    Get the directory of a split cache entry
+
+    Parameters
+    ----------
+    key: str
+        split cache key (see split_cache_key())
+    cache_dir: str or PathLike, optional
+        split cache directory (Default is get_cache_dir() / "splits")
+
+    Returns
+    -------
+    path: pathlib.Path
+        split cache entry directory
+    """
+    if cache_dir is None:
+        cache_dir = get_cache_dir() / "splits"
+    return pl.Path(cache_dir) / key
+
+
+def restore_split(
+    key: str,
+    sim_ws: Union[str, os.PathLike],
+    cache_dir: Union[str, os.PathLike] = None,
+    link: bool = False,
+) -> bool:
+    """
+    Restore a cached split simulation to a workspace
+
+    Parameters
+    ----------
+    key: str
+        split cache key (see split_cache_key())
+    sim_ws: str or PathLike
+        workspace for the split simulation
+    cache_dir: str or PathLike, optional
+        split cache directory (Default is get_cache_dir() / "splits")
+    link: bool, optional
+        hard-link the cached files into sim_ws instead of copying them.
+        Files are copied if the files cannot be linked (for example, if
+        the cache and sim_ws are on different file systems).
+        (Default is False)
+
+    Returns
+    -------
+    hit: bool
+        boolean indicating if the split simulation was in the cache
+
+    Notes
+    -----
+    Hard-linked files are shared with the read-only files of the cache
+    entry, so the split simulation cannot be rewritten in sim_ws. Only
+    use link=True if the split simulation will not be modified.
+    """
+    entry = split_cache_entry(key, cache_dir)
+    if not entry.is_dir():
+        return False
+    sim_ws = pl.Path(sim_ws)
+    for path in simulation_input_files(entry):
+        src, dst = entry / path, sim_ws / path
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if dst.exists():
+            dst.unlink()
+        if link:
+            try:
+                os.link(src, dst)
+                continue
+            except OSError:
+                pass
+        # copy the data without the read-only mode of the cache files
+        shutil.copyfile(src, dst)
+    return True
+
+
+def cache_split(
+    parallel_sim: flopy.mf6.MFSimulation,
+    mfsplit: Mf6Splitter,
+    key: str,
+    cache_dir: Union[str, os.PathLike] = None,
+    use_processes: bool = False,
+) -> pl.Path:
+    """
+    Write a split simulation and the node mapping file
+    (mfsplit_node_mapping.npz) to the split cache. The files of the
+    cache entry are read-only. The simulation path of parallel_sim is
+    changed to the cache entry, so set the simulation path before
+    writing parallel_sim again.
+
+    Parameters
+    ----------
+    parallel_sim: flopy.mf6.MFSimulation
+        split simulation
+    mfsplit: flopy.mf6.utils.Mf6Splitter
+        model splitter used to create parallel_sim
+    key: str
+        split cache key (see split_cache_key())
+    cache_dir: str or PathLike, optional
+        split cache directory (Default is get_cache_dir() / "splits")
+    use_processes: bool, optional
+        write the models and exchanges concurrently with forked processes
+        (see split_simulation()) (Default is False)
+
+    Returns
+    -------
+    path: pathlib.Path
+        split cache entry directory
+    """
+    entry = split_cache_entry(key, cache_dir)
+    # write to a temporary directory so incomplete entries are never used
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    temp = pl.Path(
+        tempfile.mkdtemp(dir=entry.parent, prefix=f"{key}.", suffix=".tmp")
+    )
+    parallel_sim.set_sim_path(temp)
+    _write_split(parallel_sim, use_processes)
+    save_node_mapping(mfsplit, temp / "mfsplit_node_mapping.npz")
+    if entry.exists():
+        # an entry with the same key has the same files
+        shutil.rmtree(temp)
+    else:
+        os.replace(temp, entry)
+        for path in simulation_input_files(entry):
+            os.chmod(entry / path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+    parallel_sim.set_sim_path(entry)
+    return entry
+
+
+def cached_split_simulation(
+    simulation: flopy.mf6.MFSimulation,
+    nparts: int,
+    sim_ws: Union[str, os.PathLike],
+    method: str = "rcb",
+    cache_dir: Union[str, os.PathLike] = None,
+    link: bool = False,
+    use_processes: bool = False,
+) -> Tuple[str, bool]:
+    """
+    Split a single model simulation (see split_simulation()) and write
+    it to sim_ws, reusing a cached split simulation if the base
+    simulation input files, the split mask, and the HPC partitions have
+    not changed
+
+    Parameters
+    ----------
+    simulation: flopy.mf6.MFSimulation
+        flopy mf6 simulation with a single model. The simulation is
+        written to its simulation path if the input files do not exist.
+    nparts: int
+        number of models to split the simulation into
+    sim_ws: str or PathLike
+        workspace for the split simulation
+    method: str, optional
+        partition_model() method (Default is "rcb")
+    cache_dir: str or PathLike, optional
+        split cache directory (Default is get_cache_dir() / "splits")
+    link: bool, optional
+        hard-link the cached files into sim_ws instead of copying them
+        (see restore_split()) (Default is False)
+    use_processes: bool, optional
+        write the models and exchanges of a new split simulation
+        concurrently with forked processes (see split_simulation())
+        (Default is False)
+
+    Returns
+    -------
+    key: str
+        split cache key
+    hit: bool
+        boolean indicating if the split simulation was in the cache
+    """
+    base_ws = pl.Path(simulation.sim_path)
+    if not (base_ws / "mfsim.nam").is_file():
+        simulation.write_simulation(silent=True)
+    split_array = partition_model(simulation.get_model(), nparts, method)
+    hpc_partitions = [
+        [int(mkey), rank] for rank, mkey in enumerate(np.unique(split_array))
+    ]
+    key = split_cache_key(base_ws, split_array, hpc_partitions)
+    if restore_split(key, sim_ws, cache_dir, link):
+        return key, True
+    mfsplit = Mf6Splitter(simulation)
+    parallel_sim = mfsplit.split_model(split_array)
+    flopy.mf6.ModflowUtlhpc(
+        parallel_sim,
+        partitions=[
+            [model_name, rank]
+            for model_name, (_, rank) in zip(
+                parallel_sim.model_names, hpc_partitions
+            )
+        ],
+    )
+    cache_split(parallel_sim, mfsplit, key, cache_dir, use_processes)
+    restore_split(key, sim_ws, cache_dir, link)
+    return key, False
+
+
+def run_mf6(
+    sim_ws: Union[str, os.PathLike],
+    nprocs: int = 1,
+    exe_name: str = "mf6",
+    mpiexec: str = "mpiexec",
+    mpiexec_args: Sequence[str] = (),
+) -> Dict[str, Union[bool, float]]:
+    """
+    Run MODFLOW 6 in a simulation workspace. Simulations are run with
+    mpiexec if nprocs is greater than 1.
+
+    Parameters
+    ----------
+    sim_ws: str or PathLike
+        simulation workspace
+    nprocs: int, optional
+        number of MPI processes (Default is 1)
+    exe_name: str, optional
+        MODFLOW 6 executable (Default is "mf6")
+    mpiexec: str, optional
+        mpiexec executable (Default is "mpiexec")
+    mpiexec_args: sequence of str, optional
+        additional mpiexec arguments, for example ("--oversubscribe",)
+        (Default is ())
+
+    Returns
+    -------
+    result: dict
+        dictionary with "success" and "wall_time" (seconds)
+    """
+    exe_path = shutil.which(exe_name)
+    if exe_path is None:
+        raise FileNotFoundError(f"'{exe_name}' not found")
+    if nprocs > 1:
+        mpiexec_path = shutil.which(mpiexec)
+        if mpiexec_path is None:
+            raise FileNotFoundError(f"'{mpiexec}' not found")
+        argv = [mpiexec_path, *mpiexec_args, "-np", str(nprocs)]
+        argv += [exe_path, "-p"]
+    else:
+        argv = [exe_path]
+    t0 = time.perf_counter()
+    proc = subprocess.run(argv, cwd=sim_ws, capture_output=True, text=True)
+    wall_time = time.perf_counter() - t0
+    success = proc.returncode == 0 and "Normal termination" in proc.stdout
+    return {"success": success, "wall_time": wall_time}
+
+
+def _rank_file(
+    sim_ws: Union[str, os.PathLike],
+    name: str,
+    suffix: str,
+    nprocs: int,
+    rank: int,
+) -> pl.Path:
+    """
+    Get the path of a file written by each MPI rank (name.p{rank}.suffix)
+    or by a serial run (name.suffix)
+    """
+    if nprocs > 1:
+        return pl.Path(sim_ws) / f"{name}.p{rank}.{suffix}"
+    return pl.Path(sim_ws) / f"{name}.{suffix}"
+
+
+def parse_elapsed_time(path: Union[str, os.PathLike]) -> float:
+    """
+    Get the elapsed run time from a MODFLOW 6 simulation listing file
+
+    Parameters
+    ----------
+    path: str or PathLike
+        simulation listing file path (mfsim.lst or mfsim.p{rank}.lst)
+
+    Returns
+    -------
+    elapsed: float
+        elapsed run time in seconds. nan is returned if the elapsed time
+        is not in the listing file.
+    """
+    seconds = {"day": 86400.0, "hour": 3600.0, "minute": 60.0, "second": 1.0}
+    with open(path) as f:
+        for line in f:
+            if "Elapsed run time:" in line:
+                elapsed = 0.0
+                values = re.findall(
+                    r"([\d.]+)\s+(day|hour|minute|second)",
+                    line.split(":", 1)[1].lower(),
+                )
+                for value, unit in values:
+                    elapsed += float(value) * seconds[unit]
+                return elapsed
+    return np.nan
+
+
+def read_solver_iterations(
+    path: Union[str, os.PathLike],
+) -> Dict[str, int]:
+    """
+    Get the total number of outer and inner iterations from an IMS inner
+    iteration csv file
+
+    Parameters
+    ----------
+    path: str or PathLike
+        IMS csv_inner_output file path
+
+    Returns
+    -------
+    iterations: dict
+        dictionary with "outer" and "inner" iterations
+    """
+    df = pd.read_csv(path)
+    outer = df.groupby(["kper", "kstp"])["nouter"].max().sum()
+    return {
+        "outer": int(outer),
+        "inner": int(df["total_inner_iterations"].iloc[-1]),
+    }
+
+
+def collect_run_statistics(
+    sim_ws: Union[str, os.PathLike],
+    nprocs: int,
+    inner_csv: str = "inner.csv",
+) -> dict:
+    """
+    Collect the elapsed time of each rank from the simulation listing
+    files and the solver iterations from the IMS inner csv files
+
+    Parameters
+    ----------
+    sim_ws: str or PathLike
+        simulation workspace
+    nprocs: int
+        number of MPI processes used for the run
+    inner_csv: str, optional
+        IMS csv_inner_output file name used by the serial simulation.
+        Parallel runs write one file per rank (inner.p{rank}.csv).
+        (Default is "inner.csv")
+
+    Returns
+    -------
+    statistics: dict
+        dictionary with the maximum and mean rank elapsed times
+        ("rank_time_max" and "rank_time_mean") and the outer and inner
+        iterations ("outer" and "inner")
+    """
+    name, suffix = inner_csv.rsplit(".", 1)
+    rank_times = []
+    iterations = {"outer": 0, "inner": 0}
+    for rank in range(nprocs):
+        listing = _rank_file(sim_ws, "mfsim", "lst", nprocs, rank)
+        rank_times.append(
+            parse_elapsed_time(listing) if listing.is_file() else np.nan
+        )
+        csv_path = _rank_file(sim_ws, name, suffix, nprocs, rank)
+        if rank == 0 and csv_path.is_file():
+            # the solution iterations are the same on every rank
+            iterations = read_solver_iterations(csv_path)
+    rank_times = np.array(rank_times)
+    return {
+        "rank_time_max": np.nanmax(rank_times) if nprocs else np.nan,
+        "rank_time_mean": np.nanmean(rank_times) if nprocs else np.nan,
+        **iterations,
+    }
+
+
+def scaling_table(
+    results: Sequence[dict],
+    weak: bool = False,
+) -> pd.DataFrame:
+    """
+    Calculate the speedup and parallel efficiency of a set of runs
+
+    Parameters
+    ----------
+    results: sequence of dicts
+        run results with at least "ncores" and "wall_time"
+    weak: bool, optional
+        weak scaling results, where the problem size grows with the core
+        count (Default is False)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        results with "speedup" and "efficiency" columns sorted by the
+        number of cores. Strong scaling speedup is T(1) / T(n) and the
+        efficiency is the speedup divided by n. Weak scaling efficiency
+        is T(1) / T(n) and the speedup is the efficiency times n.
+    """
+    df = pd.DataFrame(results).sort_values("ncores").reset_index(drop=True)
+    base_time = df["wall_time"].iloc[0] * df["ncores"].iloc[0]
+    if weak:
+        df["efficiency"] = df["wall_time"].iloc[0] / df["wall_time"]
+        df["speedup"] = df["efficiency"] * df["ncores"]
+    else:
+        df["speedup"] = base_time / df["wall_time"]
+        df["efficiency"] = df["speedup"] / df["ncores"]
+    return df
+
+
+def run_and_collect(
+    sim_ws: Union[str, os.PathLike],
+    ncores: int,
+    exe_name: str = "mf6",
+    mpiexec: str = "mpiexec",
+    mpiexec_args: Sequence[str] = (),
+    ncells: int = None,
+) -> dict:
+    """
+    Run a simulation and collect the run statistics
+
+    Parameters
+    ----------
+    sim_ws: str or PathLike
+        simulation workspace
+    ncores: int
+        number of MPI processes
+    exe_name: str, optional
+        MODFLOW 6 executable (Default is "mf6")
+    mpiexec: str, optional
+        mpiexec executable (Default is "mpiexec")
+    mpiexec_args: sequence of str, optional
+        additional mpiexec arguments (Default is ())
+    ncells: int, optional
+        number of cells in the simulation (Default is None)
+
+    Returns
+    -------
+    result: dict
+        run result (see run_mf6() and collect_run_statistics())
+    """
+    print(f"running {sim_ws} on {ncores} core(s)")
+    result = run_mf6(sim_ws, ncores, exe_name, mpiexec, mpiexec_args)
+    if not result["success"]:
+        print(f"  mf6 run in {sim_ws} did not complete successfully")
+    statistics = collect_run_statistics(sim_ws, ncores)
+    row = {"ncores": ncores, **result, **statistics}
+    if ncells is not None:
+        row["ncells"] = ncells
+    print(f"  wall time {result['wall_time']:.3f} s")
+    return row
+
+
+def strong_scaling(
+    simulation: flopy.mf6.MFSimulation,
+    cores: Sequence[int],
+    ws: Union[str, os.PathLike],
+    exe_name: str = "mf6",
+    mpiexec: str = "mpiexec",
+    mpiexec_args: Sequence[str] = (),
+    method: str = "rcb",
+    use_cache: bool = True,
+    use_processes: bool = False,
+) -> pd.DataFrame:
+    """
+    Split a simulation for each core count, run the split simulations
+    locally, and tabulate the speedup and efficiency
+
+    Parameters
+    ----------
+    simulation: flopy.mf6.MFSimulation
+        flopy mf6 simulation with a single model
+    cores: sequence of ints
+        core counts (for example, (1, 2, 4, 8)). The simulation is not
+        split for one core.
+    ws: str or PathLike
+        directory for the simulation workspaces
+    exe_name: str, optional
+        MODFLOW 6 executable (Default is "mf6")
+    mpiexec: str, optional
+        mpiexec executable (Default is "mpiexec")
+    mpiexec_args: sequence of str, optional
+        additional mpiexec arguments (Default is ())
+    method: str, optional
+        partition_model() method (Default is "rcb")
+    use_cache: bool, optional
+        reuse split simulations from the split cache (see
+        cached_split_simulation()) (Default is True)
+    use_processes: bool, optional
+        write split simulations concurrently with forked processes (see
+        split_simulation()) (Default is False)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        scaling table (see scaling_table())
+
+    Notes
+    -----
+    The simulation path is changed to ws/n001 if cores includes 1.
+    """
+    results = []
+    for ncores in cores:
+        sim_ws = pl.Path(ws) / f"n{ncores:03d}"
+        if ncores == 1:
+            simulation.set_sim_path(sim_ws)
+            simulation.write_simulation(silent=True)
+        elif use_cache:
+            cached_split_simulation(
+                simulation,
+                ncores,
+                sim_ws,
+                method,
+                use_processes=use_processes,
+            )
+        else:
+            split_simulation(simulation, ncores, sim_ws, method, use_processes)
+        results.append(
+            run_and_collect(
+                sim_ws,
+                ncores,
+                exe_name=exe_name,
+                mpiexec=mpiexec,
+                mpiexec_args=mpiexec_args,
+            )
+        )
+    return scaling_table(results)
+
+
+def _read_blocks(path: Union[str, os.PathLike]) -> Dict[str, List[List[str]]]:
+    """
+    Read the blocks of a MODFLOW 6 input file as lists of tokens keyed by
+    the lower case block name
+    """
+    blocks = {}
+    block = None
+    with open(path) as f:
+        for line in f:
+            tokens = line.split("#", 1)[0].split("!", 1)[0].split()
+            if not tokens:
+                continue
+            keyword = tokens[0].lower()
+            if keyword == "begin":
+                block = tokens[1].lower()
+                blocks.setdefault(block, [])
+            elif keyword == "end":
+                block = None
+            elif block is not None:
+                blocks[block].append(tokens)
+    return blocks
+
+
+def read_hpc_partitions(
+    sim_ws: Union[str, os.PathLike],
+) -> List[Tuple[str, int]]:
+    """
+    Read the model partitions of a simulation from the HPC file in the
+    simulation name file without loading the simulation. Models are
+    assigned to ranks in the order of the name file if the simulation
+    does not have a HPC file.
+
+    Parameters
+    ----------
+    sim_ws: str or PathLike
+        simulation workspace
+
+    Returns
+    -------
+    partitions: list of tuples
+        (model name, rank) of every model
+    """
+    sim_ws = pl.Path(sim_ws)
+    blocks = _read_blocks(sim_ws / "mfsim.nam")
+    hpc_file = None
+    for tokens in blocks.get("options", []):
+        if tokens[0].upper() == "HPC6":
+            hpc_file = tokens[-1]
+    if hpc_file is None:
+        return [
+            (tokens[2], rank)
+            for rank, tokens in enumerate(blocks.get("models", []))
+        ]
+    return [
+        (tokens[0], int(tokens[1]))
+        for tokens in _read_blocks(sim_ws / hpc_file).get("partitions", [])
+    ]
+
+
+def slurm_script(
+    sim_ws: Union[str, os.PathLike],
+    job_name: str = None,
+    account: str = None,
+    time_limit: str = "00:10:00",
+    ntasks_per_node: int = None,
+    modules: Sequence[str] = ("modflow",),
+    exe_name: str = "mf6",
+    archive: Sequence[str] = ("*.ims", "mfsim*.lst", "*.csv"),
+    archive_dir: str = "archive",
+    mail_user: str = None,
+    mail_type: str = "FAIL",
+    directives: Sequence[str] = (),
+) -> str:
+    """
+    Create a SLURM batch script for a split simulation with one task for
+    every rank in the HPC partitions of the simulation
+
+    Parameters
+    ----------
+    sim_ws: str or PathLike
+        simulation workspace
+    job_name: str, optional
+        job name (Default is None, which uses the name of sim_ws)
+    account: str, optional
+        account charged for the job (Default is None)
+    time_limit: str, optional
+        job time limit (Default is "00:10:00")
+    ntasks_per_node: int, optional
+        maximum number of tasks on a node. The number of nodes is the
+        number of tasks divided by ntasks_per_node rounded up.
+        (Default is None, which runs the job on one node)
+    modules: sequence of str, optional
+        environment modules loaded before the run (Default is
+        ("modflow",))
+    exe_name: str, optional
+        MODFLOW 6 executable (Default is "mf6")
+    archive: sequence of str, optional
+        file name patterns of the files zipped to archive_dir after the
+        run. Files are not archived if archive is None or empty.
+        (Default is ("*.ims", "mfsim*.lst", "*.csv"))
+    archive_dir: str, optional
+        archive directory, relative to sim_ws (Default is "archive")
+    mail_user: str, optional
+        email address for job notifications (Default is None)
+    mail_type: str, optional
+        job notification events (Default is "FAIL")
+    directives: sequence of str, optional
+        additional #SBATCH options (for example, ("--partition=cpu",))
+        (Default is ())
+
+    Returns
+    -------
+    script: str
+        batch script
+    """
+    sim_ws = pl.Path(sim_ws)
+    if job_name is None:
+        job_name = sim_ws.resolve().name
+    ntasks = max(rank for _, rank in read_hpc_partitions(sim_ws)) + 1
+    if ntasks_per_node is None:
+        nodes = 1
+    else:
+        nodes = -(-ntasks // ntasks_per_node)
+
+    options = [
+        f"--job-name={job_name}",
+        f"--nodes={nodes}",
+        f"--ntasks={ntasks}",
+    ]
+    if ntasks_per_node is not None:
+        options.append(f"--ntasks-per-node={ntasks_per_node}")
+    if account is not None:
+        options.append(f"--account={account}")
+    options += [f"--time={time_limit}", "--output=slurm-%j.out"]
+    if mail_user is not None:
+        options += [f"--mail-type={mail_type}", f"--mail-user={mail_user}"]
+    options += list(directives)
+
+    lines = ["#!/bin/bash", ""]
+    lines += [f"#SBATCH {option}" for option in options]
+    if modules:
+        lines += ["", "# load appropriate modules"]
+        lines += [f"module load {module}" for module in modules]
+    lines += ["", "# run model", f"srun {exe_name} -p"]
+    if archive:
+        lines += [
+            "",
+            "# archive output",
+            f"mkdir -p {archive_dir}",
+            f"zip {archive_dir}/{job_name}_{ntasks:03d}p_$(date -Ihours) "
+            + " ".join(archive),
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def write_slurm_script(
+    sim_ws: Union[str, os.PathLike],
+    file_name: str = "slurm.batch",
+    **kwargs,
+) -> pl.Path:
+    """
+    Write a SLURM batch script for a split simulation to the simulation
+    workspace (see slurm_script())
+
+    Parameters
+    ----------
+    sim_ws: str or PathLike
+        simulation workspace
+    file_name: str, optional
+        batch script file name (Default is "slurm.batch")
+    kwargs: dict
+        slurm_script() keyword arguments
+
+    Returns
+    -------
+    path: pathlib.Path
+        batch script path
+    """
+    path = pl.Path(sim_ws) / file_name
+    with open(path, "w") as f:
+        f.write(slurm_script(sim_ws, **kwargs))
+    return path
+
+
+def run_slurm_script_locally(
+    sim_ws: Union[str, os.PathLike],
+    file_name: str = "slurm.batch",
+    mpiexec: str = "mpiexec",
+    mpiexec_args: Sequence[str] = (),
+) -> Dict[str, Union[bool, float]]:
+    """
+    Run a SLURM batch script on the local machine with mpiexec instead of
+    submitting it to a cluster. srun is replaced with mpiexec using the
+    number of tasks in the script, and module commands are skipped.
+
+    Parameters
+    ----------
+    sim_ws: str or PathLike
+        simulation workspace
+    file_name: str, optional
+        batch script file name (Default is "slurm.batch")
+    mpiexec: str, optional
+        mpiexec executable (Default is "mpiexec")
+    mpiexec_args: sequence of str, optional
+        additional mpiexec arguments, for example ("--oversubscribe",)
+        (Default is ())
+
+    Returns
+    -------
+    result: dict
+        dictionary with "success", "wall_time" (seconds), and the exit
+        status of the script ("returncode"). The run is only successful
+        if every command in the script succeeded and mf6 terminated
+        normally.
+    """
+    bash = shutil.which("bash")
+    if bash is None:
+        raise FileNotFoundError("'bash' not found")
+    mpiexec_path = shutil.which(mpiexec)
+    if mpiexec_path is None:
+        raise FileNotFoundError(f"'{mpiexec}' not found")
+    with open(pl.Path(sim_ws) / file_name) as f:
+        lines = f.read().splitlines()
+
+    ntasks = 1
+    for line in lines:
+        match = re.match(r"#SBATCH\s+(?:--ntasks|-n)[=\s]+(\d+)", line)
+        if match is not None:
+            ntasks = int(match.group(1))
+    launcher = " ".join([mpiexec_path, *mpiexec_args, "-np", str(ntasks)])
+    local_lines = []
+    for line in lines:
+        if line.lstrip().startswith("module "):
+            line = f"# {line}"
+        elif line.lstrip().startswith("srun "):
+            line = line.replace("srun", launcher, 1)
+        local_lines.append(line)
+
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [bash, "-e", "-c", "\n".join(local_lines) + "\n"],
+        cwd=sim_ws,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+    )
+    wall_time = time.perf_counter() - t0
+    # bash -e stops at the first failed command, so a failed mpiexec
+    # run is not hidden by the exit status of the archive command
+    success = proc.returncode == 0 and "Normal termination" in proc.stdout
+    return {
+        "success": success,
+        "wall_time": wall_time,
+        "returncode": proc.returncode,
+    }
@@ -0,0 +1,533 @@
+from typing import Tuple
+
+import flopy
+import numpy as np
+import pandas as pd
+
+# default weight of a boundary package entry relative to an active cell
+package_weights = {
+    "drn": 0.5,
+    "riv": 0.5,
+    "ghb": 0.5,
+    "chd": 0.5,
+    "wel": 0.5,
+    "sfr": 2.0,
+    "lak": 2.0,
+    "maw": 2.0,
+    "uzf": 2.0,
+}
+
+
+def get_plan_shape(
+    modelgrid: flopy.discretization.grid.Grid,
+) -> Tuple[int, ...]:
+    """
+    Get the shape of a split mask for a modelgrid
+
+    Parameters
+    ----------
+    modelgrid: flopy.discretization.grid.Grid
+        flopy modelgrid object
+
+    Returns
+    -------
+    shape: tuple of ints
+        (nrow, ncol) for structured grids, (ncpl,) for vertex grids, and
+        (nnodes,) for unstructured grids
+    """
+    if modelgrid.grid_type == "structured":
+        return (modelgrid.nrow, modelgrid.ncol)
+    elif modelgrid.grid_type == "vertex":
+        return (modelgrid.ncpl,)
+    return (modelgrid.nnodes,)
+
+
+def _plan_index(
+    modelgrid: flopy.discretization.grid.Grid,
+    cellids: np.ndarray,
+) -> np.ndarray:
+    """
+    Convert an array of cellids to flat plan view cell numbers
+    """
+    if modelgrid.grid_type == "structured":
+        return cellids[:, 1] * modelgrid.ncol + cellids[:, 2]
+    elif modelgrid.grid_type == "vertex":
+        return cellids[:, 1]
+    return cellids[:, 0]
+
+
+def _package_cellids(package) -> np.ndarray:
+    """
+    Get the cellids of all of the entries in a boundary package as a
+    two-dimensional integer array. The maximum number of entries in any
+    stress period is used for list-based stress packages.
+    """
+    if package.package_type in ("sfr", "lak", "maw", "uzf"):
+        names = {
+            "sfr": "packagedata",
+            "lak": "connectiondata",
+            "maw": "connectiondata",
+            "uzf": "packagedata",
+        }
+        records = [getattr(package, names[package.package_type]).get_data()]
+    elif hasattr(package, "stress_period_data"):
+        spd = package.stress_period_data.get_data()
+        records = [] if spd is None else list(spd.values())
+    else:
+        return np.zeros((0, 1), dtype=int)
+
+    cellids = np.zeros((0, 1), dtype=int)
+    for rec in records:
+        if rec is None or "cellid" not in rec.dtype.names:
+            continue
+        # unconnected reaches have a cellid of None or "none"
+        cellid = [c for c in rec["cellid"] if isinstance(c, tuple)]
+        if len(cellid) > cellids.shape[0]:
+            cellids = np.array(cellid, dtype=int)
+    return cellids
+
+
+def cell_weights(
+    model: flopy.mf6.ModflowGwf,
+    active_weight: float = 1.0,
+    package_weights: dict = package_weights,
+) -> np.ndarray:
+    """
+    Estimate the computational load of each plan view cell column.
+    The weight is the number of active cells in the column times
+    active_weight plus the number of boundary package entries in the
+    column times the weight for the package type.
+
+    Parameters
+    ----------
+    model: flopy.mf6.ModflowGwf
+        flopy groundwater flow model
+    active_weight: float, optional
+        weight of an active cell (Default is 1.0)
+    package_weights: dict, optional
+        weight of a boundary entry for each package type (for example
+        {"drn": 0.5, "sfr": 2.0}). Package types that are not included
+        are not weighted. (Default is partition.package_weights)
+
+    Returns
+    -------
+    weights: numpy.ndarray
+        weights with the shape of the split mask
+    """
+    modelgrid = model.modelgrid
+    shape = get_plan_shape(modelgrid)
+    idomain = modelgrid.idomain
+    if idomain is None:
+        active = np.ones(shape, dtype=float) * modelgrid.nlay
+    else:
+        active = (idomain.reshape(-1, *shape) > 0).sum(axis=0)
+    weights = active_weight * active.astype(float).ravel()
+
+    for package in model.packagelist:
+        weight = package_weights.get(package.package_type, 0.0)
+        if weight == 0.0:
+            continue
+        cellids = _package_cellids(package)
+        if cellids.shape[0] > 0:
+            index = _plan_index(modelgrid, cellids)
+            weights += weight * np.bincount(index, minlength=weights.shape[0])
+    return weights.reshape(shape)
+
+
+def _cell_coordinates(
+    modelgrid: flopy.discretization.grid.Grid,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get flat x and y coordinates for each plan view cell
+    """
+    if modelgrid.grid_type == "structured":
+        # row and column numbers keep ties aligned with grid lines
+        y, x = np.indices(get_plan_shape(modelgrid))
+        return x.ravel().astype(float), -y.ravel().astype(float)
+    x = np.ravel(modelgrid.xcellcenters)[: np.prod(get_plan_shape(modelgrid))]
+    y = np.ravel(modelgrid.ycellcenters)[: x.shape[0]]
+    return x, y
+
+
+def recursive_bisection(
+    weights: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    nparts: int,
+) -> np.ndarray:
+    """
+    Partition cells by recursive coordinate bisection. Each set of cells
+    is split across its longest coordinate extent so that the weight
+    of each side is proportional to the number of partitions on that
+    side. nparts does not need to be a power of two.
+
+    Parameters
+    ----------
+    weights: numpy.ndarray
+        flat cell weights
+    x: numpy.ndarray
+        flat cell x coordinates
+    y: numpy.ndarray
+        flat cell y coordinates
+    nparts: int
+        number of partitions
+
+    Returns
+    -------
+    labels: numpy.ndarray
+        flat partition number for each cell
+    """
+    labels = np.zeros(weights.shape[0], dtype=int)
+    stack = [(np.arange(weights.shape[0]), 0, nparts)]
+    while stack:
+        index, first, count = stack.pop()
+        if count == 1:
+            labels[index] = first
+            continue
+        xi, yi = x[index], y[index]
+        if np.ptp(xi) >= np.ptp(yi):
+            order = np.lexsort((yi, xi))
+        else:
+            order = np.lexsort((xi, yi))
+        index = index[order]
+        cumulative = np.cumsum(weights[index])
+        nleft = count // 2
+        target = cumulative[-1] * nleft / count
+        split = np.searchsorted(cumulative, target, side="left") + 1
+        split = min(max(split, 1), index.shape[0] - 1)
+        stack.append((index[:split], first, nleft))
+        stack.append((index[split:], first + nleft, count - nleft))
+    return labels
+
+
+def hilbert_index(
+    x: np.ndarray,
+    y: np.ndarray,
+    order: int = 16,
+) -> np.ndarray:
+    """
+    Calculate the position of points along a Hilbert curve
+
+    Parameters
+    ----------
+    x: numpy.ndarray
+        x coordinates
+    y: numpy.ndarray
+        y coordinates
+    order: int, optional
+        number of bits used to quantize each coordinate (Default is 16)
+
+    Returns
+    -------
+    d: numpy.ndarray
+        distance along the Hilbert curve
+    """
+    n = 2**order
+    ix = np.zeros(x.shape, dtype=np.int64)
+    iy = np.zeros(y.shape, dtype=np.int64)
+    for v, iv in ((x, ix), (y, iy)):
+        vrange = np.ptp(v)
+        if vrange > 0:
+            iv[:] = np.minimum((v - v.min()) / vrange * n, n - 1)
+    d = np.zeros(x.shape, dtype=np.int64)
+    s = n // 2
+    while s > 0:
+        rx = (ix & s) > 0
+        ry = (iy & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        # rotate the quadrant
+        flip = ~ry & rx
+        ix = np.where(flip, n - 1 - ix, ix)
+        iy = np.where(flip, n - 1 - iy, iy)
+        swap = ~ry
+        ix, iy = np.where(swap, iy, ix), np.where(swap, ix, iy)
+        s //= 2
+    return d
+
+
+def space_filling_curve(
+    weights: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    nparts: int,
+) -> np.ndarray:
+    """
+    Partition cells by cutting a Hilbert curve through the cell centers
+    into pieces with equal weight
+
+    Parameters
+    ----------
+    weights: numpy.ndarray
+        flat cell weights
+    x: numpy.ndarray
+        flat cell x coordinates
+    y: numpy.ndarray
+        flat cell y coordinates
+    nparts: int
+        number of partitions
+
+    Returns
+    -------
+    labels: numpy.ndarray
+        flat partition number for each cell
+    """
+    order = np.argsort(hilbert_index(x, y), kind="stable")
+    cumulative = np.cumsum(weights[order])
+    cumulative -= 0.5 * weights[order]
+    labels = np.empty(weights.shape[0], dtype=int)
+    labels[order] = np.minimum(
+        (cumulative / cumulative[-1] * nparts).astype(int), nparts - 1
+    )
+    return labels
+
+
+def partition_model(
+    model: flopy.mf6.ModflowGwf,
+    nparts: int,
+    method: str = "rcb",
+    active_weight: float = 1.0,
+    package_weights: dict = package_weights,
+) -> np.ndarray:
+    """
+    Create a load-balanced split mask for Mf6Splitter.split_model()
+
+    Parameters
+    ----------
+    model: flopy.mf6.ModflowGwf
+        flopy groundwater flow model
+    nparts: int
+        number of partitions
+    method: str, optional
+        "rcb" for recursive coordinate bisection or "sfc" for Hilbert
+        space-filling curve ordering (Default is "rcb")
+    active_weight: float, optional
+        weight of an active cell (Default is 1.0)
+    package_weights: dict, optional
+        weight of a boundary entry for each package type (Default is
+        partition.package_weights)
+
+    Returns
+    -------
+    split_array: numpy.ndarray
+        partition number for each plan view cell with the shape
+        (nrow, ncol) for structured grids and (ncpl,) for vertex grids
+    """
+    if nparts < 1:
+        raise ValueError(f"nparts must be at least 1 not {nparts}")
+    methods = {"rcb": recursive_bisection, "sfc": space_filling_curve}
+    if method not in methods:
+        raise ValueError(f"method must be one of {tuple(methods)}")
+
+    modelgrid = model.modelgrid
+    weights = cell_weights(model, active_weight, package_weights).ravel()
+    x, y = _cell_coordinates(modelgrid)
+    labels = methods[method](weights, x, y, nparts)
+    return labels.reshape(get_plan_shape(modelgrid))
+
+
+def plan_connections(
+    modelgrid: flopy.discretization.grid.Grid,
+) -> np.ndarray:
+    """
+    Get the pairs of plan view cells that share a face
+
+    Parameters
+    ----------
+    modelgrid: flopy.discretization.grid.Grid
+        structured or vertex flopy modelgrid object
+
+    Returns
+    -------
+    pairs: numpy.ndarray
+        flat plan view cell numbers of connected cells with shape
+        (nconnections, 2)
+    """
+    if modelgrid.grid_type == "structured":
+        cell = np.arange(modelgrid.nrow * modelgrid.ncol).reshape(
+            modelgrid.nrow, modelgrid.ncol
+        )
+        return np.concatenate(
+            (
+                np.column_stack((cell[:, :-1].ravel(), cell[:, 1:].ravel())),
+                np.column_stack((cell[:-1, :].ravel(), cell[1:, :].ravel())),
+            )
+        )
+    elif modelgrid.grid_type != "vertex":
+        raise ValueError(
+            f"'{modelgrid.grid_type}' grids are not supported, "
+            + "only structured and vertex grids"
+        )
+
+    # cells that share an edge (two vertices) are connected
+    iverts = modelgrid.iverts
+    nverts = np.fromiter(map(len, iverts), dtype=int, count=len(iverts))
+    first = np.concatenate(iverts)
+    second = np.concatenate([np.roll(iv, -1) for iv in iverts])
+    cells = np.repeat(np.arange(nverts.shape[0]), nverts)
+    keep = first != second
+    edges = np.sort(np.column_stack((first, second))[keep], axis=1)
+    cells = cells[keep]
+    order = np.lexsort((edges[:, 1], edges[:, 0]))
+    edges, cells = edges[order], cells[order]
+    shared = np.flatnonzero((edges[1:] == edges[:-1]).all(axis=1))
+    return np.column_stack((cells[shared], cells[shared + 1]))
+
+
+def _connection_counts(
+    modelgrid: flopy.discretization.grid.Grid,
+    pairs: np.ndarray,
+) -> np.ndarray:
+    """
+    Count the number of layers where both cells of a plan view
+    connection are active
+    """
+    shape = get_plan_shape(modelgrid)
+    if modelgrid.idomain is None:
+        return np.full(pairs.shape[0], modelgrid.nlay, dtype=int)
+    active = modelgrid.idomain.reshape(-1, int(np.prod(shape))) > 0
+    return (active[:, pairs[:, 0]] & active[:, pairs[:, 1]]).sum(axis=0)
+
+
+class _PartitionData:
+    """
+    Grid data used to evaluate split masks for a model
+    """
+
+    def __init__(self, model, active_weight, package_weights):
+        modelgrid = model.modelgrid
+        self.shape = get_plan_shape(modelgrid)
+        if modelgrid.idomain is None:
+            self.active = np.full(int(np.prod(self.shape)), modelgrid.nlay)
+        else:
+            self.active = (
+                modelgrid.idomain.reshape(-1, int(np.prod(self.shape))) > 0
+            ).sum(axis=0)
+        self.weights = cell_weights(
+            model, active_weight, package_weights
+        ).ravel()
+        pairs = plan_connections(modelgrid)
+        counts = _connection_counts(modelgrid, pairs)
+        self.pairs = pairs[counts > 0]
+        self.counts = counts[counts > 0]
+
+
+def _evaluate(data: _PartitionData, split_array: np.ndarray) -> dict:
+    """
+    Calculate partition quality metrics for a split mask
+    """
+    labels = np.asarray(split_array, dtype=int).ravel()
+    if labels.shape[0] != data.active.shape[0]:
+        raise ValueError(
+            f"split_array shape {np.shape(split_array)} does not match "
+            + f"the model split mask shape {data.shape}"
+        )
+    nparts = labels.max() + 1
+    active = np.bincount(labels, weights=data.active, minlength=nparts)
+    weight = np.bincount(labels, weights=data.weights, minlength=nparts)
+
+    a = labels[data.pairs[:, 0]]
+    b = labels[data.pairs[:, 1]]
+    cross = a != b
+    a, b, counts = a[cross], b[cross], data.counts[cross]
+    halo = np.bincount(a, weights=counts, minlength=nparts) + np.bincount(
+        b, weights=counts, minlength=nparts
+    )
+    neighbor_pairs = np.unique(
+        np.concatenate((a * nparts + b, b * nparts + a))
+    )
+    neighbors = np.bincount(neighbor_pairs // nparts, minlength=nparts)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        comm_ratio = np.where(active > 0, halo / active, np.inf)
+    return {
+        "nparts": int(nparts),
+        "active": active.astype(int),
+        "weight": weight,
+        "halo": halo.astype(int),
+        "neighbors": neighbors,
+        "comm_ratio": comm_ratio,
+        "imbalance": active.max() / active.mean(),
+        "weight_imbalance": weight.max() / weight.mean(),
+        "exchanges": int(counts.sum()),
+        "max_neighbors": int(neighbors.max()),
+        "max_comm_ratio": float(comm_ratio.max()),
+    }
+
+
+def partition_quality(
+    model: flopy.mf6.ModflowGwf,
+    split_array: np.ndarray,
+    active_weight: float = 1.0,
+    package_weights: dict = package_weights,
+) -> dict:
+    """
+    Evaluate a split mask for Mf6Splitter.split_model() without running
+    MODFLOW 6. The communication-to-computation ratio of a partition is
+    the number of GWF-GWF exchange connections (halo cells) divided by
+    the number of active cells.
+
+    Parameters
+    ----------
+    model: flopy.mf6.ModflowGwf
+        flopy groundwater flow model with a structured or vertex grid
+    split_array: numpy.ndarray
+        partition number for each plan view cell
+    active_weight: float, optional
+        weight of an active cell (Default is 1.0)
+    package_weights: dict, optional
+        weight of a boundary entry for each package type (Default is
+        partition.package_weights)
+
+    Returns
+    -------
+    quality: dict
+        dictionary with per partition arrays ("active", "weight", "halo",
+        "neighbors", and "comm_ratio") and summary values ("nparts",
+        "imbalance", "weight_imbalance", "exchanges", "max_neighbors",
+        and "max_comm_ratio"). Imbalance ratios are the maximum divided
+        by the mean.
+    """
+    data = _PartitionData(model, active_weight, package_weights)
+    return _evaluate(data, split_array)
+
+
+def compare_partitions(
+    model: flopy.mf6.ModflowGwf,
+    split_arrays: dict,
+    active_weight: float = 1.0,
+    package_weights: dict = package_weights,
+) -> pd.DataFrame:
+    """
+    Compare the summary quality metrics of several split masks
+
+    Parameters
+    ----------
+    model: flopy.mf6.ModflowGwf
+        flopy groundwater flow model with a structured or vertex grid
+    split_arrays: dict
+        dictionary of split masks keyed by name
+    active_weight: float, optional
+        weight of an active cell (Default is 1.0)
+    package_weights: dict, optional
+        weight of a boundary entry for each package type (Default is
+        partition.package_weights)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        summary metrics indexed by the split mask names
+    """
+    data = _PartitionData(model, active_weight, package_weights)
+    summary = (
+        "nparts",
+        "imbalance",
+        "weight_imbalance",
+        "exchanges",
+        "max_neighbors",
+        "max_comm_ratio",
+    )
+    rows = {}
+    for name, split_array in split_arrays.items():
+        quality = _evaluate(data, split_array)
+        rows[name] = {key: quality[key] for key in summary}
+    return pd.DataFrame.from_dict(rows, orient="index")
@@ -0,0 +1,171 @@
+import argparse
+import math
+import multiprocessing
+import pathlib as pl
+import shutil
+import warnings
+
+import flopy
+from benchmark_watershed import StageTimer, build_simulation
+from parallel_run import (
+    cached_split_simulation,
+    run_and_collect,
+    scaling_table,
+    split_simulation,
+)
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+
+def build_watershed(dx, nlay, raster, sim_ws, exe_name):
+    print(f"building the watershed model with dx=dy={dx:g}")
+    return build_simulation(
+        dx,
+        dx,
+        nlay,
+        raster,
+        sim_ws,
+        exe_name,
+        "intersect",
+        False,
+        StageTimer(),
+    )
+
+
+def prepare_run(sim, ncores, sim_ws, method, use_cache):
+    # the script is single-threaded, so split simulations can be written
+    # with forked processes where fork is available
+    use_processes = "fork" in multiprocessing.get_all_start_methods()
+    if ncores == 1:
+        sim.set_sim_path(sim_ws)
+        sim.write_simulation(silent=True)
+    elif use_cache:
+        key, hit = cached_split_simulation(
+            sim, ncores, sim_ws, method, use_processes=use_processes
+        )
+        print(f"split {key[:12]} {'reused from' if hit else 'added to'} cache")
+    else:
+        split_simulation(sim, ncores, sim_ws, method, use_processes)
+
+
+def ncells(sim):
+    return sum(
+        sim.get_model(model_name).modelgrid.nnodes
+        for model_name in sim.model_names
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Strong and weak scaling of the split watershed model "
+        + "run locally with mpiexec."
+    )
+    parser.add_argument(
+        "--cores",
+        nargs="+",
+        type=int,
+        default=[1, 2, 4],
+        help="Core counts to run",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("strong", "weak"),
+        default="strong",
+        help="Strong scaling (fixed grid) or weak scaling (the number of "
+        + "cells grows with the number of cores)",
+    )
+    parser.add_argument(
+        "--dx",
+        type=float,
+        default=1000.0,
+        help="Cell size (for one core in weak scaling mode)",
+    )
+    parser.add_argument(
+        "--nlay",
+        type=int,
+        default=5,
+        help="Number of layers",
+    )
+    parser.add_argument(
+        "--method",
+        choices=("rcb", "sfc"),
+        default="rcb",
+        help="partition_model method",
+    )
+    parser.add_argument(
+        "--no-split-cache",
+        action="store_true",
+        help="Split the simulation for every run instead of reusing "
+        + "cached split simulations",
+    )
+    parser.add_argument(
+        "--exe",
+        default="mf6",
+        help="MODFLOW 6 executable",
+    )
+    parser.add_argument(
+        "--mpiexec",
+        default="mpiexec",
+        help="mpiexec executable",
+    )
+    parser.add_argument(
+        "--mpiexec-args",
+        nargs="*",
+        default=[],
+        help="Additional mpiexec arguments "
+        + "(for example, --mpiexec-args=--oversubscribe)",
+    )
+    parser.add_argument(
+        "--ws",
+        default="temp/scaling",
+        help="Workspace for the scaling simulations",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="csv file for the scaling table",
+    )
+    args = parser.parse_args()
+
+    if shutil.which(args.exe) is None:
+        parser.error(f"'{args.exe}' not found")
+    if max(args.cores) > 1 and shutil.which(args.mpiexec) is None:
+        parser.error(f"'{args.mpiexec}' not found")
+
+    root = pl.Path(__file__).resolve().parent
+    raster = flopy.utils.Raster.load(
+        root / "../../data/watershed/fine_topo.tif"
+    )
+    ws = pl.Path(args.ws) / args.mode
+
+    results = []
+    if args.mode == "strong":
+        sim = build_watershed(
+            args.dx, args.nlay, raster, ws / "base", args.exe
+        )
+    for ncores in sorted(args.cores):
+        sim_ws = ws / f"n{ncores:03d}"
+        if args.mode == "weak":
+            # grow the number of cells in proportion to the core count
+            dx = args.dx / math.sqrt(ncores)
+            sim = build_watershed(
+                dx, args.nlay, raster, ws / f"base{ncores:03d}", args.exe
+            )
+        prepare_run(sim, ncores, sim_ws, args.method, not args.no_split_cache)
+        results.append(
+            run_and_collect(
+                sim_ws,
+                ncores,
+                exe_name=args.exe,
+                mpiexec=args.mpiexec,
+                mpiexec_args=args.mpiexec_args,
+                ncells=ncells(sim),
+            )
+        )
+
+    df = scaling_table(results, weak=args.mode == "weak")
+    print(df.to_string(index=False))
+    if args.output is not None:
+        pl.Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(args.output, index=False)
+        print(f"Scaling table written to '{args.output}'")
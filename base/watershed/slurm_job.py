@@ -0,0 +1,95 @@
+import argparse
+
+from parallel_run import run_slurm_script_locally, write_slurm_script
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write a SLURM batch script for a split simulation "
+        + "sized to the HPC partitions, and optionally run it locally "
+        + "with mpiexec."
+    )
+    parser.add_argument("sim_ws", help="Split simulation workspace")
+    parser.add_argument(
+        "--file-name",
+        default="slurm.batch",
+        help="Batch script file name",
+    )
+    parser.add_argument("--job-name", default=None, help="Job name")
+    parser.add_argument("--account", default=None, help="Account")
+    parser.add_argument(
+        "--time",
+        default="00:10:00",
+        help="Job time limit",
+    )
+    parser.add_argument(
+        "--ntasks-per-node",
+        type=int,
+        default=None,
+        help="Maximum number of tasks on a node",
+    )
+    parser.add_argument(
+        "--module",
+        action="append",
+        default=None,
+        help="Module to load (may be repeated, default is modflow)",
+    )
+    parser.add_argument(
+        "--exe",
+        default="mf6",
+        help="MODFLOW 6 executable",
+    )
+    parser.add_argument(
+        "--archive",
+        nargs="*",
+        default=["*.ims", "mfsim*.lst", "*.csv"],
+        help="File name patterns to archive after the run "
+        + "(no patterns disables archiving)",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        default="archive",
+        help="Archive directory relative to the simulation workspace",
+    )
+    parser.add_argument("--mail-user", default=None, help="Email address")
+    parser.add_argument(
+        "--run-local",
+        action="store_true",
+        help="Run the batch script locally with mpiexec",
+    )
+    parser.add_argument(
+        "--mpiexec",
+        default="mpiexec",
+        help="mpiexec executable",
+    )
+    parser.add_argument(
+        "--mpiexec-args",
+        nargs="*",
+        default=[],
+        help="Additional mpiexec arguments "
+        + "(for example, --mpiexec-args=--oversubscribe)",
+    )
+    args = parser.parse_args()
+
+    path = write_slurm_script(
+        args.sim_ws,
+        file_name=args.file_name,
+        job_name=args.job_name,
+        account=args.account,
+        time_limit=args.time,
+        ntasks_per_node=args.ntasks_per_node,
+        modules=("modflow",) if args.module is None else args.module,
+        exe_name=args.exe,
+        archive=args.archive,
+        archive_dir=args.archive_dir,
+        mail_user=args.mail_user,
+    )
+    print(f"Batch script written to '{path}'")
+    if args.run_local:
+        result = run_slurm_script_locally(
+            args.sim_ws,
+            file_name=args.file_name,
+            mpiexec=args.mpiexec,
+            mpiexec_args=args.mpiexec_args,
+        )
+        status = "completed" if result["success"] else "failed"
+        print(f"Local run {status} in {result['wall_time']:.3f} s")
@@ -0,0 +1,823 @@
+import argparse
+import importlib.util
+import io
+import os
+import pathlib as pl
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+
+# columns read from the IMS csv files and the names used in the store
+inner_columns = {
+    "total_inner_iterations": "total_inner_iterations",
+    "totim": "totim",
+    "kper": "kper",
+    "kstp": "kstp",
+    "nouter": "nouter",
+    "ninner": "niter",
+    "solution_inner_dvmax": "dvmax",
+    "solution_inner_rmax": "rmax",
+}
+outer_columns = {
+    "total_inner_iterations": "total_inner_iterations",
+    "totim": "totim",
+    "kper": "kper",
+    "kstp": "kstp",
+    "nouter": "nouter",
+    "inner_iterations": "niter",
+    "solution_outer_dvmax": "dvmax",
+}
+store_dtypes = {
+    "table": "category",
+    "rank": np.int32,
+    "total_inner_iterations": np.int64,
+    "totim": np.float64,
+    "kper": np.int32,
+    "kstp": np.int32,
+    "nouter": np.int32,
+    "niter": np.int32,
+    "dvmax": np.float64,
+    "rmax": np.float64,
+}
+solve_keys = ["rank", "kper", "kstp"]
+
+
+def _parquet_engine() -> Union[str, None]:
+    """
+    Get the available pandas parquet engine
+    """
+    for engine in ("pyarrow", "fastparquet"):
+        if importlib.util.find_spec(engine) is not None:
+            return engine
+    return None
+
+
+def find_csv_files(
+    run_dir: Union[str, os.PathLike],
+    name: str,
+) -> Dict[int, pl.Path]:
+    """
+    Find the IMS csv files written by a serial (name.csv) or a parallel
+    (name.p{rank}.csv) run
+
+    Parameters
+    ----------
+    run_dir: str or PathLike
+        simulation workspace
+    name: str
+        csv file name without the extension (for example, "inner")
+
+    Returns
+    -------
+    files: dict
+        csv file paths keyed by rank
+    """
+    run_dir = pl.Path(run_dir)
+    pattern = re.compile(rf"{re.escape(name)}\.p(\d+)\.csv$", re.IGNORECASE)
+    files = {}
+    for path in run_dir.glob(f"{name}.p*.csv"):
+        match = pattern.match(path.name)
+        if match is not None:
+            files[int(match.group(1))] = path
+    if not files and (run_dir / f"{name}.csv").is_file():
+        files[0] = run_dir / f"{name}.csv"
+    return dict(sorted(files.items()))
+
+
+def read_ims_csv(
+    path: Union[str, os.PathLike],
+    table: str,
+    rank: int = 0,
+) -> pd.DataFrame:
+    """
+    Read the solution columns of an IMS inner or outer csv file. Model
+    columns are not read.
+
+    Parameters
+    ----------
+    path: str or PathLike
+        csv file path
+    table: str
+        "inner" or "outer"
+    rank: int, optional
+        process rank (Default is 0)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        csv data with the store column names
+    """
+    columns = inner_columns if table == "inner" else outer_columns
+    header = pd.read_csv(path, nrows=0).columns.str.strip()
+    usecols = [column for column in columns if column in header]
+    kwargs = {}
+    if importlib.util.find_spec("pyarrow") is not None:
+        kwargs["engine"] = "pyarrow"
+    df = pd.read_csv(path, usecols=usecols, **kwargs)
+    return _store_frame(df, table, rank)
+
+
+def _store_frame(df: pd.DataFrame, table: str, rank: int) -> pd.DataFrame:
+    """
+    Rename the columns of IMS csv data to the store column names and
+    add the table and rank
+    """
+    columns = inner_columns if table == "inner" else outer_columns
+    df.columns = df.columns.str.strip()
+    df = df[[column for column in columns if column in df]]
+    df = df.rename(columns=columns)
+    df["table"] = table
+    df["rank"] = rank
+    for column in store_dtypes:
+        if column not in df:
+            df[column] = np.nan
+    return df[list(store_dtypes)].astype(store_dtypes)
+
+
+def _store_path(run_dir: pl.Path) -> pl.Path:
+    if _parquet_engine() is not None:
+        return run_dir / "solver_csv.parquet"
+    return run_dir / "solver_csv.npz"
+
+
+def ingest_run(
+    run_dir: Union[str, os.PathLike],
+    inner: str = "inner",
+    outer: str = "outer",
+    rebuild: bool = False,
+) -> pl.Path:
+    """
+    Combine the IMS inner and outer csv files of a serial or parallel run
+    into a single columnar store in the run directory. A parquet file
+    is written if pyarrow or fastparquet is installed, otherwise a npz
+    file with one array per column is written. The store is only
+    rebuilt if a csv file is newer than the store.
+
+    Parameters
+    ----------
+    run_dir: str or PathLike
+        simulation workspace
+    inner: str, optional
+        inner csv file name without the extension (Default is "inner")
+    outer: str, optional
+        outer csv file name without the extension (Default is "outer")
+    rebuild: bool, optional
+        rebuild the store even if it is up to date (Default is False)
+
+    Returns
+    -------
+    path: pathlib.Path
+        store path
+    """
+    run_dir = pl.Path(run_dir)
+    sources = {
+        "inner": find_csv_files(run_dir, inner),
+        "outer": find_csv_files(run_dir, outer),
+    }
+    if not sources["inner"] and not sources["outer"]:
+        raise FileNotFoundError(f"no IMS csv files in '{run_dir}'")
+    path = _store_path(run_dir)
+    mtime = max(
+        p.stat().st_mtime for files in sources.values() for p in files.values()
+    )
+    if not rebuild and path.is_file() and path.stat().st_mtime >= mtime:
+        return path
+
+    frames = [
+        read_ims_csv(csv_path, table, rank)
+        for table, files in sources.items()
+        for rank, csv_path in files.items()
+    ]
+    df = pd.concat(frames, ignore_index=True).astype(store_dtypes)
+    fd, temp_path = tempfile.mkstemp(
+        dir=run_dir, prefix=f"{path.name}.", suffix=".tmp"
+    )
+    os.close(fd)
+    engine = _parquet_engine()
+    if engine is not None:
+        df.to_parquet(temp_path, engine=engine, index=False)
+    else:
+        arrays = {column: df[column].to_numpy() for column in df.columns}
+        arrays["table"] = df["table"].cat.codes.to_numpy()
+        arrays["table_categories"] = np.asarray(
+            df["table"].cat.categories, dtype=str
+        )
+        with open(temp_path, "wb") as f:
+            np.savez(f, **arrays)
+    os.replace(temp_path, path)
+    return path
+
+
+def load_store(
+    path: Union[str, os.PathLike],
+    columns: list = None,
+) -> pd.DataFrame:
+    """
+    Load a solver csv store written by ingest_run()
+
+    Parameters
+    ----------
+    path: str or PathLike
+        store path
+    columns: list, optional
+        columns to load (Default is None, which loads every column)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+    """
+    path = pl.Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    with np.load(path) as f:
+        names = list(store_dtypes) if columns is None else columns
+        data = {name: f[name] for name in names if name != "table"}
+        if "table" in names:
+            data["table"] = pd.Categorical.from_codes(
+                f["table"], categories=f["table_categories"]
+            )
+    return pd.DataFrame(data)[names]
+
+
+def solve_iterations(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count the outer and inner iterations of each solve (time step)
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        inner iteration data from the store
+
+    Returns
+    -------
+    solves: pandas.DataFrame
+        "outer" and "inner" iterations indexed by rank, kper, and kstp
+    """
+    inner = df[df["table"] == "inner"]
+    grouped = inner.groupby(solve_keys, sort=True, observed=True)
+    return pd.DataFrame(
+        {"outer": grouped["nouter"].max(), "inner": grouped["nouter"].size()}
+    )
+
+
+def convergence_rates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate the average reduction of the maximum dependent variable
+    change per inner iteration, in orders of magnitude, for each outer
+    iteration
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        inner iteration data from the store
+
+    Returns
+    -------
+    rates: pandas.DataFrame
+        "iterations", "first_dvmax", "last_dvmax", and "rate" indexed
+        by rank, kper, kstp, and nouter
+    """
+    inner = df[df["table"] == "inner"]
+    log_dv = np.log10(np.maximum(np.abs(inner["dvmax"].to_numpy()), 1e-300))
+    grouped = (
+        inner.assign(log_dv=log_dv)
+        .groupby(solve_keys + ["nouter"], sort=True, observed=True)["log_dv"]
+        .agg(["first", "last", "size"])
+    )
+    rate = (grouped["first"] - grouped["last"]) / np.maximum(
+        grouped["size"] - 1, 1
+    )
+    return pd.DataFrame(
+        {
+            "iterations": grouped["size"],
+            "first_dvmax": 10.0 ** grouped["first"],
+            "last_dvmax": 10.0 ** grouped["last"],
+            "rate": rate,
+        }
+    )
+
+
+def detect_stagnation(
+    df: pd.DataFrame,
+    window: int = 10,
+    min_reduction: float = 0.1,
+) -> pd.DataFrame:
+    """
+    Find outer iterations where the maximum dependent variable change
+    decreases by less than min_reduction orders of magnitude over window
+    inner iterations
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        inner iteration data from the store
+    window: int, optional
+        number of inner iterations (Default is 10)
+    min_reduction: float, optional
+        minimum reduction in orders of magnitude (Default is 0.1)
+
+    Returns
+    -------
+    stagnation: pandas.DataFrame
+        number of "stagnant_iterations" for every outer iteration with
+        stagnant inner iterations, indexed by rank, kper, kstp, and nouter
+    """
+    inner = df[df["table"] == "inner"]
+    keys = solve_keys + ["nouter"]
+    log_dv = pd.Series(
+        np.log10(np.maximum(np.abs(inner["dvmax"].to_numpy()), 1e-300)),
+        index=inner.index,
+    )
+    previous = log_dv.groupby(
+        [inner[key] for key in keys], observed=True
+    ).shift(window)
+    stagnant = (previous - log_dv) < min_reduction
+    counts = stagnant.groupby(
+        [inner[key] for key in keys], observed=True
+    ).sum()
+    counts = counts[counts > 0].astype(int)
+    return counts.rename("stagnant_iterations").to_frame()
+
+
+def iteration_inflation(
+    parallel: pd.DataFrame,
+    serial: pd.DataFrame,
+) -> Dict[str, float]:
+    """
+    Calculate the ratio of the parallel and serial outer and inner
+    iterations. The iterations of rank 0 are used for the parallel run.
+
+    Parameters
+    ----------
+    parallel: pandas.DataFrame
+        inner iteration data from the parallel run store
+    serial: pandas.DataFrame
+        inner iteration data from the serial run store
+
+    Returns
+    -------
+    inflation: dict
+        dictionary with "outer" and "inner" iteration ratios
+    """
+    p = solve_iterations(parallel[parallel["rank"] == 0]).sum()
+    s = solve_iterations(serial).sum()
+    return {
+        "outer": p["outer"] / s["outer"],
+        "inner": p["inner"] / s["inner"],
+    }
+
+
+def summarize_run(
+    run_dir: Union[str, os.PathLike],
+    serial_dir: Union[str, os.PathLike] = None,
+    window: int = 10,
+    min_reduction: float = 0.1,
+) -> dict:
+    """
+    Summarize the solver convergence of a serial or parallel run
+
+    Parameters
+    ----------
+    run_dir: str or PathLike
+        simulation workspace
+    serial_dir: str or PathLike, optional
+        serial simulation workspace used to calculate the iteration
+        inflation of a parallel run (Default is None)
+    window: int, optional
+        stagnation window (Default is 10)
+    min_reduction: float, optional
+        stagnation reduction in orders of magnitude (Default is 0.1)
+
+    Returns
+    -------
+    summary: dict
+    """
+    columns = ["table", "rank", "kper", "kstp", "nouter", "dvmax"]
+    df = load_store(ingest_run(run_dir), columns=columns)
+    df = df[df["table"] == "inner"]
+    ranks = np.unique(df["rank"])
+    df0 = df[df["rank"] == ranks[0]]
+    solves = solve_iterations(df0)
+    rates = convergence_rates(df0)
+    stagnation = detect_stagnation(df0, window, min_reduction)
+    summary = {
+        "run_dir": str(run_dir),
+        "ranks": int(ranks.shape[0]),
+        "solves": int(solves.shape[0]),
+        "outer": int(solves["outer"].sum()),
+        "inner": int(solves["inner"].sum()),
+        "max_outer": int(solves["outer"].max()),
+        "max_inner": int(solves["inner"].max()),
+        "median_rate": float(rates["rate"].median()),
+        "stagnant_outer_iterations": int(stagnation.shape[0]),
+    }
+    if serial_dir is not None:
+        serial = load_store(ingest_run(serial_dir), columns=columns)
+        inflation = iteration_inflation(df, serial)
+        summary["outer_inflation"] = inflation["outer"]
+        summary["inner_inflation"] = inflation["inner"]
+    return summary
+
+
+class _CsvTail:
+    """
+    Read the rows appended to a csv file since the last read. Incomplete
+    lines are kept until the rest of the line is written.
+    """
+
+    def __init__(self, path: pl.Path):
+        self.path = path
+        self.offset = 0
+        self.header = None
+        self.partial = b""
+
+    def read(self) -> Union[pd.DataFrame, None]:
+        size = self.path.stat().st_size
+        if size < self.offset:
+            # the file was rewritten by a new run
+            self.offset, self.header, self.partial = 0, None, b""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = self.partial + f.read()
+        self.offset += len(data) - len(self.partial)
+        end = data.rfind(b"\n") + 1
+        lines, self.partial = data[:end], data[end:]
+        if self.header is None:
+            if not lines:
+                return None
+            self.header, lines = lines.split(b"\n", 1)
+        if not lines.strip():
+            return None
+        return pd.read_csv(io.BytesIO(self.header + b"\n" + lines))
+
+
+class ConvergenceMonitor:
+    """
+    Follow the IMS inner csv files of every rank of a running serial or
+    parallel simulation and check the convergence of the current outer
+    iteration
+
+    Parameters
+    ----------
+    run_dir: str or PathLike
+        simulation workspace
+    name: str, optional
+        inner csv file name without the extension (Default is "inner")
+    window: int, optional
+        number of inner iterations used to calculate the dvmax trend and
+        to detect stagnation. window should be less than the IMS
+        inner_maximum. (Default is 25)
+    min_reduction: float, optional
+        an outer iteration stagnates if the smallest dvmax of the last
+        window inner iterations is less than min_reduction orders of
+        magnitude below the smallest dvmax before the window
+        (Default is 0.5)
+    max_growth: float, optional
+        an outer iteration diverges if dvmax is not finite or is more
+        than max_growth orders of magnitude above the smallest dvmax of
+        the outer iteration, or if the first dvmax of the outer
+        iteration is more than max_growth orders of magnitude above the
+        smallest first dvmax of the earlier outer iterations of the time
+        step (Default is 3.0)
+
+    Notes
+    -----
+    The dvmax history is restarted for every outer iteration, because
+    the first inner iterations of an outer iteration start well above
+    the dvmax reached in the previous outer iteration.
+
+    csv files that have not been modified since the monitor was created
+    (for example, files from an earlier run) are not read.
+    """
+
+    def __init__(
+        self,
+        run_dir: Union[str, os.PathLike],
+        name: str = "inner",
+        window: int = 25,
+        min_reduction: float = 0.5,
+        max_growth: float = 3.0,
+    ):
+        self.run_dir = pl.Path(run_dir)
+        self.name = name
+        self.window = window
+        self.min_reduction = min_reduction
+        self.max_growth = max_growth
+        self.start = time.time()
+        self.tails = {}
+        self.solves = {}
+        self.last_poll = (time.perf_counter(), 0)
+
+    def _update(self, rank: int, df: pd.DataFrame) -> None:
+        """
+        Add new inner iterations to the current outer iteration of a rank
+        """
+        keys = ["kper", "kstp", "nouter"]
+        for step, group in df.groupby(keys, sort=False):
+            with np.errstate(divide="ignore"):
+                log_dv = np.log10(np.abs(group["dvmax"].to_numpy())).tolist()
+            solve = self.solves.get(rank)
+            if solve is None or solve["step"] != step:
+                # keep the first dvmax of the earlier outer iterations of
+                # the time step to check the outer iterations for growth
+                outer_log_dv = []
+                if solve is not None and solve["step"][:2] == step[:2]:
+                    outer_log_dv = solve["outer_log_dv"]
+                solve = {
+                    "step": step,
+                    "log_dv": [],
+                    "outer_log_dv": outer_log_dv + log_dv[:1],
+                }
+                self.solves[rank] = solve
+            solve["total"] = int(group["total_inner_iterations"].iloc[-1])
+            solve["dvmax"] = float(group["dvmax"].iloc[-1])
+            solve["log_dv"] += log_dv
+
+    def _growth(self, log_dv: np.ndarray) -> bool:
+        """
+        Check if the last value of a log10 dvmax history is not finite or
+        more than max_growth above the smallest finite value
+        """
+        if np.isnan(log_dv[-1]) or log_dv[-1] == np.inf:
+            return True
+        finite = log_dv[np.isfinite(log_dv)]
+        return bool(
+            finite.shape[0] and log_dv[-1] - finite.min() > self.max_growth
+        )
+
+    def _status(self, solve: dict) -> str:
+        """
+        Check the current outer iteration for divergence and stagnation.
+        The first dvmax of the outer iterations of the time step is also
+        checked for divergence.
+        """
+        log_dv = np.array(solve["log_dv"])
+        if self._growth(log_dv) or self._growth(
+            np.array(solve["outer_log_dv"])
+        ):
+            return "diverged"
+        if log_dv.shape[0] > self.window:
+            before = np.min(log_dv[: -self.window])
+            recent = np.min(log_dv[-self.window :])
+            if before - recent < self.min_reduction:
+                return "stagnated"
+        return "running"
+
+    def poll(self) -> Union[dict, None]:
+        """
+        Read the inner iterations written since the last poll
+
+        Returns
+        -------
+        status: dict or None
+            None if no csv files have been written yet. Otherwise a
+            dictionary with the number of "ranks", the current solve
+            ("kper", "kstp", and "nouter") and "dvmax" of rank 0, the
+            smallest total number of inner iterations of the ranks
+            ("inner"), the inner iteration "rate" (iterations per second)
+            since the last poll, the dvmax "trend" (orders of magnitude
+            per inner iteration) of rank 0 over the last window inner
+            iterations of the outer iteration, the "status" ("running",
+            "stagnated", or "diverged"), and the "ranks_failing" that
+            stagnated or diverged
+        """
+        for rank, path in find_csv_files(self.run_dir, self.name).items():
+            if rank not in self.tails:
+                if path.stat().st_mtime < self.start:
+                    continue
+                self.tails[rank] = _CsvTail(path)
+            df = self.tails[rank].read()
+            if df is not None and df.shape[0] > 0:
+                self._update(rank, _store_frame(df, "inner", rank))
+        if not self.solves:
+            return None
+
+        statuses = {
+            rank: self._status(solve) for rank, solve in self.solves.items()
+        }
+        failing = [
+            rank for rank, value in statuses.items() if value != "running"
+        ]
+        status = "running"
+        for value in ("stagnated", "diverged"):
+            if value in statuses.values():
+                status = value
+
+        now = time.perf_counter()
+        inner = min(solve["total"] for solve in self.solves.values())
+        previous_time, previous_inner = self.last_poll
+        self.last_poll = (now, inner)
+        first = self.solves[min(self.solves)]
+        log_dv = np.array(first["log_dv"][-self.window :])
+        log_dv = log_dv[np.isfinite(log_dv)]
+        trend = np.nan
+        if log_dv.shape[0] > 1:
+            trend = np.polyfit(np.arange(log_dv.shape[0]), log_dv, 1)[0]
+        return {
+            "ranks": len(self.solves),
+            "kper": first["step"][0],
+            "kstp": first["step"][1],
+            "nouter": first["step"][2],
+            "inner": inner,
+            "rate": (inner - previous_inner) / max(now - previous_time, 1e-9),
+            "dvmax": first["dvmax"],
+            "trend": trend,
+            "status": status,
+            "ranks_failing": failing,
+        }
+
+
+def _process_running(process: Union[subprocess.Popen, int, None]) -> bool:
+    if process is None:
+        return True
+    if isinstance(process, subprocess.Popen):
+        return process.poll() is None
+    try:
+        os.kill(process, 0)
+    except OSError:
+        return False
+    return True
+
+
+def _stop_process(process: Union[subprocess.Popen, int]) -> None:
+    if isinstance(process, subprocess.Popen):
+        process.terminate()
+    else:
+        os.kill(process, signal.SIGTERM)
+
+
+def monitor_run(
+    run_dir: Union[str, os.PathLike],
+    process: Union[subprocess.Popen, int] = None,
+    interval: float = 5.0,
+    stop: bool = False,
+    verbose: bool = True,
+    **kwargs,
+) -> dict:
+    """
+    Monitor the convergence of a running simulation until the run ends
+    or the solve stagnates or diverges (see ConvergenceMonitor)
+
+    Parameters
+    ----------
+    run_dir: str or PathLike
+        simulation workspace
+    process: subprocess.Popen or int, optional
+        mf6 (or mpiexec) process or process id. The run is monitored
+        until the process ends. (Default is None, which monitors the run
+        until it stagnates or diverges)
+    interval: float, optional
+        seconds between polls (Default is 5.0)
+    stop: bool, optional
+        terminate process if the solve stagnates or diverges (Default is
+        False)
+    verbose: bool, optional
+        print the status after every poll (Default is True)
+    kwargs: dict
+        ConvergenceMonitor keyword arguments
+
+    Returns
+    -------
+    status: dict
+        last status (see ConvergenceMonitor.poll()) with "stopped", a
+        boolean indicating if the process was terminated. The status
+        is "completed" if the process ended without a stagnated or
+        diverged solve.
+    """
+    monitor = ConvergenceMonitor(run_dir, **kwargs)
+    last = {"status": "running"}
+    while True:
+        running = _process_running(process)
+        status = monitor.poll()
+        if status is not None:
+            last = status
+            if verbose:
+                print(
+                    f"kper {status['kper']:>4d} kstp {status['kstp']:>4d} "
+                    + f"outer {status['nouter']:>4d} "
+                    + f"inner {status['inner']:>8d} "
+                    + f"{status['rate']:8.1f} it/s "
+                    + f"dvmax {status['dvmax']:10.3e} "
+                    + f"trend {status['trend']:7.3f} "
+                    + status["status"]
+                )
+            if status["status"] != "running":
+                break
+        if not running:
+            break
+        time.sleep(interval)
+    last["stopped"] = False
+    if last["status"] != "running":
+        if stop and process is not None and _process_running(process):
+            _stop_process(process)
+            last["stopped"] = True
+    elif process is not None:
+        last["status"] = "completed"
+    return last
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Summarize the IMS convergence of a serial or parallel "
+        + "MODFLOW 6 run from the inner and outer csv files."
+    )
+    parser.add_argument("run_dir", help="Simulation workspace")
+    parser.add_argument(
+        "--serial",
+        default=None,
+        help="Serial simulation workspace used to calculate the parallel "
+        + "iteration inflation",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=None,
+        help="Number of inner iterations used to detect stagnation "
+        + "(default is 10, or 25 with --follow)",
+    )
+    parser.add_argument(
+        "--min-reduction",
+        type=float,
+        default=None,
+        help="Minimum dvmax reduction (orders of magnitude) over the "
+        + "stagnation window (default is 0.1, or 0.5 with --follow)",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Monitor the csv files while the simulation runs",
+    )
+    parser.add_argument(
+        "--pid",
+        type=int,
+        default=None,
+        help="Process id of the run followed with --follow. Monitoring "
+        + "ends when the process ends.",
+    )
+    parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Terminate the --pid process if the solve stagnates or "
+        + "diverges",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Seconds between polls with --follow",
+    )
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        default=3.0,
+        help="dvmax growth (orders of magnitude) above the smallest dvmax "
+        + "of a solve that is treated as divergence with --follow",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild the csv store",
+    )
+    args = parser.parse_args()
+
+    if args.follow:
+        status = monitor_run(
+            args.run_dir,
+            process=args.pid,
+            interval=args.interval,
+            stop=args.stop,
+            window=25 if args.window is None else args.window,
+            min_reduction=(
+                0.5 if args.min_reduction is None else args.min_reduction
+            ),
+            max_growth=args.max_growth,
+        )
+        print(
+            f"run {status['status']}", "(stopped)" if status["stopped"] else ""
+        )
+        sys.exit(0 if status["status"] in ("running", "completed") else 1)
+
+    if args.window is None:
+        args.window = 10
+    if args.min_reduction is None:
+        args.min_reduction = 0.1
+    t0 = time.perf_counter()
+    if args.rebuild:
+        for run_dir in (args.run_dir, args.serial):
+            if run_dir is not None:
+                ingest_run(run_dir, rebuild=True)
+    summary = summarize_run(
+        args.run_dir, args.serial, args.window, args.min_reduction
+    )
+    for key, value in summary.items():
+        if isinstance(value, float):
+            value = f"{value:.4g}"
+        print(f"{key:<26s} {value}")
+    print(f"{'elapsed':<26s} {time.perf_counter() - t0:.3f} s")